@@ -1,5 +1,6 @@
 import os
 import json
+from datetime import timedelta
 
 CONFIG_FILE = 'config.json'
 
@@ -12,9 +13,46 @@ def load_config():
         'server_port': '',
         'api_token': '',
         'app_id': '',
-        'tenant_id': ''
+        'tenant_id': '',
+        'grpc_compression': '',  # gzip or deflate if the ChirpStack server accepts compressed requests
+        'log_level': 'info',  # debug, info or alert
+        'log_console': True,
+        'virtual_grid': False,  # Only create widgets for visible tiles (large fleets)
+        'offline_timeouts': {},  # device type -> minutes without uplinks before Offline (default 10)
+        'history_db': 'history.db',  # SQLite event history
+        'history_retention_days': 30,
+        'mqtt_decoder': '',  # orjson, ujson or json; empty picks the fastest one installed
+        'mqtt_app_ids': [],  # Further applications to receive events from besides app_id
+        'mqtt_workers': 0,  # >0 receives through that many processes on an MQTT shared subscription
+        'mqtt_share_group': 'vts-gui',
+        'service_host': '127.0.0.1',  # HTTP API of monitor_service.py
+        'service_port': 8765,
+        'snapshot_file': 'snapshot.json',  # Node inventory and state for a fast warm start
+        'alert_debounce_seconds': 10,  # Further alerts within this time don't resend 0xFF to a target
+        'alert_stale_seconds': 120,  # An untransmitted 0xFF older than this is flushed and replaced
+        'gui_alert_fanout': 'auto'  # true, false, or auto: only while no monitor service answers at service_host:port
     }
 
 def save_config(config):
     with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=2)
\ No newline at end of file
+        json.dump(config, f, indent=2)
+
+def get_mqtt_config(config):
+    return {
+        'broker': config['mqtt_broker'],
+        'port': int(config['mqtt_port']),
+        'decoder': config.get('mqtt_decoder'),
+        'app_ids': [config['app_id']] + config.get('mqtt_app_ids', []),
+        'workers': config.get('mqtt_workers', 0),
+        'share_group': config.get('mqtt_share_group')
+    }
+
+def get_offline_timeouts(config):
+    return {device_type: timedelta(minutes=minutes) for device_type, minutes
+            in config.get('offline_timeouts', {}).items()}
+
+def get_alert_options(config):
+    return {
+        'window': config.get('alert_debounce_seconds', 10),
+        'stale_after': config.get('alert_stale_seconds', 120)
+    }
@@ -0,0 +1,92 @@
+import csv
+import json
+import os
+import re
+
+HEX_EUI = re.compile(r"^[0-9a-fA-F]{16}$")
+HEX_KEY = re.compile(r"^[0-9a-fA-F]{32}$")
+# Accepted spellings of each manifest column
+COLUMNS = {
+    'dev_eui': ('dev_eui', 'deveui', 'eui'),
+    'name': ('name',),
+    'device_type': ('type', 'device_type'),
+    'profile': ('profile', 'device_profile', 'device_profile_id'),
+    'nwk_key': ('nwk_key', 'nwkkey', 'key'),
+}
+
+
+class ManifestError(Exception):
+    pass
+
+
+def read_manifest(path):
+    """Rows of a CSV or JSON device manifest as (line, dict) pairs.
+
+    A JSON manifest is a list of objects, or an object with a "devices" list.
+    Its line numbers are positions in that list, starting at 1.
+    """
+    try:
+        with open(path, newline="") as f:
+            if os.path.splitext(path)[1].lower() == ".json":
+                data = json.load(f)
+                rows = data.get('devices', []) if isinstance(data, dict) else data
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    raise ManifestError("JSON manifest must be a list of device objects")
+                return list(enumerate(rows, start=1))
+            reader = csv.DictReader(f)
+            return [(reader.line_num, row) for row in reader]
+    except (OSError, ValueError, csv.Error) as e:
+        raise ManifestError(f"Cannot read manifest {path}: {str(e)}")
+
+
+def _field(row, name):
+    for column in COLUMNS[name]:
+        for key, value in row.items():
+            if key is not None and key.strip().lower() == column and value is not None:
+                return str(value).strip()
+    return ""
+
+
+def validate_manifest(rows, profiles, existing=()):
+    """Check every row before anything is provisioned.
+
+    profiles are the tenant's device profiles (dicts with id and name); a row's
+    profile may give either. existing holds dev_euis already known to the
+    application. Returns (devices, errors): devices are dicts with line, dev_eui
+    (lower case), name, device_type, device_profile_id and nwk_key; errors are
+    (line, dev_eui, message) tuples.
+    """
+    profile_ids = {profile['id'] for profile in profiles}
+    profiles_by_name = {profile['name']: profile['id'] for profile in profiles}
+    existing = set(existing)
+    seen = set()
+    devices, errors = [], []
+    for line, row in rows:
+        dev_eui = _field(row, 'dev_eui').lower()
+        name = _field(row, 'name')
+        device_type = _field(row, 'device_type')
+        profile = _field(row, 'profile')
+        nwk_key = _field(row, 'nwk_key').lower()
+        problems = []
+        if not HEX_EUI.match(dev_eui):
+            problems.append("dev_eui must be 16 hex digits")
+        elif dev_eui in seen:
+            problems.append("duplicate dev_eui in manifest")
+        elif dev_eui in existing:
+            problems.append("device already exists")
+        if not name:
+            problems.append("name is required")
+        if not device_type:
+            problems.append("type is required")
+        device_profile_id = profile if profile in profile_ids else profiles_by_name.get(profile)
+        if not device_profile_id:
+            problems.append(f"unknown device profile '{profile}'")
+        if not HEX_KEY.match(nwk_key):
+            problems.append("nwk_key must be 32 hex digits")
+        seen.add(dev_eui)
+        if problems:
+            errors.append((line, dev_eui, "; ".join(problems)))
+        else:
+            devices.append({'line': line, 'dev_eui': dev_eui, 'name': name, 'device_type': device_type,
+                            'device_profile_id': device_profile_id, 'nwk_key': nwk_key})
+    return devices, errors
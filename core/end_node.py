@@ -1,17 +1,78 @@
-from datetime import datetime, timedelta
+import math
+from datetime import datetime
+from .offline_scheduler import DEFAULT_OFFLINE_TIMEOUT
 from utils.logging_utils import logger
 
 
+RSSI_UNKNOWN = -32768
+
+
 class EndNode:
-    def __init__(self, dev_eui, name, device_type):
+    """A node's identity plus a view onto its state in a NodeStore slot.
+
+    Nodes created without a store get a private one-slot store, and removed nodes
+    are detached onto one, so an EndNode always behaves like a plain object.
+    """
+
+    __slots__ = ('dev_eui', 'name', 'device_type', 'store', 'slot')
+
+    def __init__(self, dev_eui, name, device_type, store=None):
         self.dev_eui = dev_eui
         self.name = name
         self.device_type = device_type
-        self.status = "Unknown"
-        self.last_seen = None
-        self.rssi = None
-        self.snr = None
-        self.has_alert = False
+        if store is None:
+            from .node_store import NodeStore
+            store = NodeStore(capacity=1)
+        store.attach(self)
+
+    @property
+    def status(self):
+        return self.store.status_names[self.store.status[self.slot]]
+
+    @status.setter
+    def status(self, value):
+        self.store.status[self.slot] = self.store.status_code(value)
+
+    @property
+    def last_seen(self):
+        value = float(self.store.last_seen[self.slot])
+        return None if math.isnan(value) else datetime.fromtimestamp(value)
+
+    @last_seen.setter
+    def last_seen(self, value):
+        self.store.last_seen[self.slot] = math.nan if value is None else value.timestamp()
+
+    @property
+    def rssi(self):
+        value = int(self.store.rssi[self.slot])
+        return None if value == RSSI_UNKNOWN else value
+
+    @rssi.setter
+    def rssi(self, value):
+        self.store.rssi[self.slot] = int(value) if isinstance(value, (int, float)) else RSSI_UNKNOWN
+
+    @property
+    def snr(self):
+        value = float(self.store.snr[self.slot])
+        return None if math.isnan(value) else value
+
+    @snr.setter
+    def snr(self, value):
+        self.store.snr[self.slot] = float(value) if isinstance(value, (int, float)) else math.nan
+
+    @property
+    def has_alert(self):
+        return bool(self.store.has_alert[self.slot])
+
+    @has_alert.setter
+    def has_alert(self, value):
+        self.store.has_alert[self.slot] = value
+
+    def detach(self):
+        from .node_store import NodeStore
+        state = (self.status, self.last_seen, self.rssi, self.snr, self.has_alert)
+        NodeStore(capacity=1).attach(self)
+        self.status, self.last_seen, self.rssi, self.snr, self.has_alert = state
 
     def update_status(self, status, last_seen, rssi=None, snr=None):
         old_status = self.status
@@ -20,37 +81,37 @@ class EndNode:
         self.last_seen = last_seen
         self.rssi = rssi
         self.snr = snr
-        logger.log(f"Node {self.name} status updated: {old_status} -> {self.status} (Alert: {self.has_alert})")
+        logger.debug("Node %s status updated: %s -> %s (Alert: %s)", self.name, old_status, self.status, self.has_alert)
 
     def update_last_seen(self):
         self.last_seen = datetime.now()
         if not self.has_alert:
             old_status = self.status
             self.status = "Online"
-            logger.log(f"Node {self.name} last seen updated. Status: {old_status} -> {self.status}")
+            logger.debug("Node %s last seen updated. Status: %s -> %s", self.name, old_status, self.status)
 
     def set_alert(self):
         self.has_alert = True
         old_status = self.status
         self.status = "Alert"
-        logger.log(f"Node {self.name} set to alert. Status: {old_status} -> {self.status}")
+        logger.debug("Node %s set to alert. Status: %s -> %s", self.name, old_status, self.status)
 
-    def clear_alert(self):
+    def clear_alert(self, timeout=DEFAULT_OFFLINE_TIMEOUT):
         self.has_alert = False
         old_status = self.status
-        self.status = "Online" if self.is_online() else "Offline"
-        logger.log(f"Node {self.name} alert cleared. Status: {old_status} -> {self.status}")
+        self.status = "Online" if self.is_online(timeout) else "Offline"
+        logger.debug("Node %s alert cleared. Status: %s -> %s", self.name, old_status, self.status)
 
-    def is_online(self):
+    def is_online(self, timeout=DEFAULT_OFFLINE_TIMEOUT):
         if self.last_seen is None:
             return False
-        return datetime.now() - self.last_seen < timedelta(minutes=10)
+        return datetime.now() - self.last_seen < timeout
 
     def set_offline(self):
         if not self.has_alert:
             old_status = self.status
             self.status = "Offline"
-            logger.log(f"Node {self.name} set to offline. Status: {old_status} -> {self.status}")
+            logger.debug("Node %s set to offline. Status: %s -> %s", self.name, old_status, self.status)
 
 
 def __str__(self):
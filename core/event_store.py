@@ -0,0 +1,147 @@
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class Event:
+    __slots__ = ('seq', 'timestamp', 'event_type', 'dev_eui', 'device_name', 'message', 'rssi', 'snr', 'is_alert')
+
+    def __init__(self, event_type, dev_eui=None, device_name=None, message=None, rssi=None, snr=None,
+                 is_alert=False, timestamp=None):
+        self.seq = None
+        self.timestamp = timestamp or datetime.now()
+        self.event_type = event_type
+        self.dev_eui = dev_eui
+        self.device_name = device_name
+        self.message = message
+        self.rssi = rssi
+        self.snr = snr
+        self.is_alert = is_alert
+
+    def format(self):
+        parts = []
+        if self.device_name or self.dev_eui:
+            device = self.device_name or self.dev_eui
+            parts.append(f"Device: {device}" + (f" ({self.dev_eui})" if self.device_name and self.dev_eui else ""))
+        if self.rssi is not None:
+            parts.append(f"RSSI: {self.rssi}")
+        if self.snr is not None:
+            parts.append(f"SNR: {self.snr}")
+        if self.message:
+            parts.append(f"Message: {self.message}")
+        details = f" - {', '.join(parts)}" if parts else ""
+        return f"{self.timestamp:%Y-%m-%d %H:%M:%S} - {self.event_type}{details}"
+
+    __str__ = format
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'timestamp': self.timestamp.isoformat(),
+            'event_type': self.event_type,
+            'dev_eui': self.dev_eui,
+            'device_name': self.device_name,
+            'message': self.message,
+            'rssi': self.rssi,
+            'snr': self.snr,
+            'is_alert': self.is_alert,
+        }
+
+
+class EventStore:
+    """Fixed-capacity ring buffer of structured events.
+
+    Once capacity is reached each new event evicts the oldest, so memory stays
+    flat however long the application runs. Per-device, per-type and alert
+    indexes hold sequence numbers and are trimmed on eviction, which keeps
+    filtered queries proportional to the matching events rather than the buffer.
+    Safe to append from any thread.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.next_seq = 0
+        self.by_device = {}
+        self.by_type = {}
+        self.alerts = deque()
+        self.lock = threading.Lock()
+
+    @property
+    def version(self):
+        # Changes whenever an event is added; lets views skip redundant refreshes
+        return self.next_seq
+
+    @property
+    def oldest_seq(self):
+        return max(0, self.next_seq - self.capacity)
+
+    def __len__(self):
+        return self.next_seq - self.oldest_seq
+
+    def append(self, event):
+        with self.lock:
+            seq = self.next_seq
+            slot = seq % self.capacity
+            evicted = self.slots[slot]
+            if evicted is not None:
+                self._unindex(evicted)
+            event.seq = seq
+            self.slots[slot] = event
+            self.next_seq += 1
+            if event.dev_eui:
+                self.by_device.setdefault(event.dev_eui, deque()).append(seq)
+            self.by_type.setdefault(event.event_type, deque()).append(seq)
+            if event.is_alert:
+                self.alerts.append(seq)
+        return event
+
+    def _unindex(self, event):
+        # The evicted event is always the oldest entry of each index it appears in
+        if event.dev_eui:
+            seqs = self.by_device[event.dev_eui]
+            seqs.popleft()
+            if not seqs:
+                del self.by_device[event.dev_eui]
+        seqs = self.by_type[event.event_type]
+        seqs.popleft()
+        if not seqs:
+            del self.by_type[event.event_type]
+        if event.is_alert:
+            self.alerts.popleft()
+
+    def query(self, dev_eui=None, event_type=None, alerts_only=False, start=None, end=None, limit=None):
+        """Events matching all given filters, oldest first; limit keeps the newest."""
+        with self.lock:
+            candidates = [range(self.oldest_seq, self.next_seq)]
+            if dev_eui is not None:
+                candidates.append(self.by_device.get(dev_eui, ()))
+            if event_type is not None:
+                candidates.append(self.by_type.get(event_type, ()))
+            if alerts_only:
+                candidates.append(self.alerts)
+            seqs = min(candidates, key=len)
+
+            result = []
+            # Walk newest to oldest so time ranges and limits can stop early
+            for seq in reversed(seqs):
+                event = self.slots[seq % self.capacity]
+                if end is not None and event.timestamp > end:
+                    continue
+                if start is not None and event.timestamp < start:
+                    break
+                if dev_eui is not None and event.dev_eui != dev_eui:
+                    continue
+                if event_type is not None and event.event_type != event_type:
+                    continue
+                if alerts_only and not event.is_alert:
+                    continue
+                result.append(event)
+                if limit is not None and len(result) >= limit:
+                    break
+        result.reverse()
+        return result
+
+    def event_types(self):
+        with self.lock:
+            return sorted(self.by_type)
@@ -0,0 +1,204 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from .event_store import Event
+from utils.logging_utils import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    event_type TEXT NOT NULL,
+    dev_eui TEXT,
+    device_name TEXT,
+    message TEXT,
+    rssi INTEGER,
+    snr REAL,
+    is_alert INTEGER NOT NULL DEFAULT 0,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_device_ts ON events (dev_eui, ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (event_type, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_alert_ts ON events (ts) WHERE is_alert = 1;
+"""
+
+
+class HistoryStore:
+    """Durable event history in an SQLite database.
+
+    add() only queues the event; a writer thread inserts queued events in one
+    transaction per batch. The database runs in WAL mode so queries from other
+    threads don't wait for the writer. Events older than retention_days are
+    deleted every compact_interval seconds and the freed pages returned to the
+    file system.
+    """
+
+    def __init__(self, path="history.db", batch_size=500, flush_interval=1.0, retention_days=30,
+                 compact_interval=3600, max_query_rows=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # seconds
+        self.retention_days = retention_days  # None or 0 keeps everything
+        self.compact_interval = compact_interval  # seconds
+        self.max_query_rows = max_query_rows
+        self.queue = queue.Queue()
+        self.writer = None
+        self.version = 0  # Bumped after every committed batch
+        self._running = False
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._reader = None
+        self._event_types = set()  # Kept in memory so listing them never scans the table
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            connection = self._connect()
+            # auto_vacuum only takes effect if set before the first table is created
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.executescript(SCHEMA)
+            connection.commit()
+            self._event_types = {row[0] for row in connection.execute("SELECT DISTINCT event_type FROM events")}
+            self._reader = self._connect()
+            self.writer = threading.Thread(target=self._writer_loop, args=(connection,), name="history-writer",
+                                           daemon=True)
+            self._running = True
+            self.writer.start()
+        logger.log(f"History store opened: {self.path}")
+
+    def add(self, event, payload=None):
+        """Queue an Event (and optional JSON-serializable payload) for storage."""
+        if self._running:
+            self.queue.put((event, payload))
+
+    def _writer_loop(self, connection):
+        pending = []
+        last_flush = time.monotonic()
+        last_compact = 0.0
+        try:
+            while True:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ()
+
+                if item is None:
+                    break
+                if isinstance(item, threading.Event):
+                    self._insert(connection, pending)
+                    last_flush = time.monotonic()
+                    item.set()
+                    continue
+                if item:
+                    pending.append(item)
+
+                if len(pending) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                    self._insert(connection, pending)
+                    last_flush = time.monotonic()
+                if self.retention_days and time.monotonic() - last_compact >= self.compact_interval:
+                    self._compact(connection)
+                    last_compact = time.monotonic()
+        finally:
+            self._insert(connection, pending)
+            connection.close()
+
+    def _insert(self, connection, pending):
+        if not pending:
+            return
+        rows = [(event.timestamp.timestamp(), event.event_type, event.dev_eui, event.device_name, event.message,
+                 event.rssi, event.snr, int(event.is_alert), None if payload is None else json.dumps(payload))
+                for event, payload in pending]
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO events (ts, event_type, dev_eui, device_name, message, rssi, snr, is_alert, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # Replaced rather than updated so event_types() can read it from any thread
+            self._event_types = self._event_types | {row[1] for row in rows}
+            self.version += 1
+        except sqlite3.Error as e:
+            logger.alert("Failed to store %d history events: %s", len(rows), e)
+        pending.clear()
+
+    def _compact(self, connection):
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
+        try:
+            with connection:
+                deleted = connection.execute("DELETE FROM events WHERE ts < ?", (cutoff,)).rowcount
+            if deleted:
+                connection.execute("PRAGMA incremental_vacuum")
+                logger.info("Removed %d history events older than %s days", deleted, self.retention_days)
+        except sqlite3.Error as e:
+            logger.alert("History compaction failed: %s", e)
+
+    def flush(self, timeout=5.0):
+        """Block until everything added so far has been committed."""
+        with self._lock:
+            if not self._running:
+                return
+            done = threading.Event()
+            self.queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        with self._lock:
+            writer = self.writer if self._running else None
+            self._running = False
+            if writer:
+                self.queue.put(None)
+        if writer:
+            writer.join()
+        with self._read_lock:
+            if self._reader:
+                self._reader.close()
+                self._reader = None
+
+    def query(self, dev_eui=None, event_type=None, alerts_only=False, start=None, end=None, limit=None):
+        """Stored events matching all given filters, oldest first.
+
+        Takes the same arguments as EventStore.query; limit keeps the newest and
+        defaults to max_query_rows.
+        """
+        clauses, params = [], []
+        if dev_eui is not None:
+            clauses.append("dev_eui = ?")
+            params.append(dev_eui)
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        if alerts_only:
+            clauses.append("is_alert = 1")
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(end.timestamp())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit or self.max_query_rows)
+        sql = ("SELECT ts, event_type, dev_eui, device_name, message, rssi, snr, is_alert FROM events "
+               f"{where} ORDER BY ts DESC LIMIT ?")
+        with self._read_lock:
+            if self._reader is None:
+                return []
+            rows = self._reader.execute(sql, params).fetchall()
+        events = [Event(event_type, dev_eui, device_name, message, rssi, snr, bool(is_alert),
+                        timestamp=datetime.fromtimestamp(ts))
+                  for ts, event_type, dev_eui, device_name, message, rssi, snr, is_alert in rows]
+        events.reverse()
+        return events
+
+    def event_types(self):
+        return sorted(self._event_types)
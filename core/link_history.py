@@ -0,0 +1,171 @@
+import threading
+import warnings
+from datetime import datetime
+import numpy as np
+from .end_node import RSSI_UNKNOWN
+
+DEFAULT_DEPTH = 64
+
+
+class LinkHistory:
+    """Per-node ring buffers of recent uplink receptions.
+
+    Each node owns one row of preallocated (capacity, depth) arrays: timestamp
+    (float64), RSSI (int16), SNR (float32) and an interned gateway index (int32),
+    18 bytes per entry. With the default depth of 64 that is about 1.2 KB per
+    node however long it runs. Statistics are computed on the whole matrix at
+    once, so fleet-wide numbers cost one NumPy pass rather than a loop per node.
+    """
+
+    def __init__(self, depth=DEFAULT_DEPTH, capacity=1024):
+        self.depth = depth
+        self.capacity = 0
+        self.timestamps = np.zeros((0, depth), dtype=np.float64)
+        self.rssi = np.zeros((0, depth), dtype=np.int16)
+        self.snr = np.zeros((0, depth), dtype=np.float32)
+        self.gateways = np.zeros((0, depth), dtype=np.int32)
+        self.heads = np.zeros(0, dtype=np.int32)  # next write position per row
+        self.counts = np.zeros(0, dtype=np.int32)
+        self.rows = {}  # dev_eui -> row
+        self.free_rows = []
+        self.gateway_ids = []
+        self.gateway_codes = {}
+        self.lock = threading.Lock()
+        self._grow(capacity)
+
+    @property
+    def bytes_per_node(self):
+        return self.depth * (8 + 2 + 4 + 4) + 8
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        self.timestamps = np.concatenate([self.timestamps, np.zeros((extra, self.depth))])
+        self.rssi = np.concatenate([self.rssi, np.full((extra, self.depth), RSSI_UNKNOWN, dtype=np.int16)])
+        self.snr = np.concatenate([self.snr, np.full((extra, self.depth), np.nan, dtype=np.float32)])
+        self.gateways = np.concatenate([self.gateways, np.zeros((extra, self.depth), dtype=np.int32)])
+        self.heads = np.concatenate([self.heads, np.zeros(extra, dtype=np.int32)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int32)])
+        self.free_rows.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def _gateway_code(self, gateway_id):
+        code = self.gateway_codes.get(gateway_id)
+        if code is None:
+            code = len(self.gateway_ids)
+            self.gateway_ids.append(gateway_id)
+            self.gateway_codes[gateway_id] = code
+        return code
+
+    def record(self, dev_eui, timestamp, rssi, snr=None, gateway_id=None):
+        """Append one reception; timestamp is a datetime."""
+        with self.lock:
+            row = self.rows.get(dev_eui)
+            if row is None:
+                if not self.free_rows:
+                    self._grow(max(1, self.capacity * 2))
+                row = self.free_rows.pop()
+                self.heads[row] = 0
+                self.counts[row] = 0
+                self.rows[dev_eui] = row
+            head = self.heads[row]
+            self.timestamps[row, head] = timestamp.timestamp()
+            self.rssi[row, head] = rssi if isinstance(rssi, (int, float)) else RSSI_UNKNOWN
+            self.snr[row, head] = snr if isinstance(snr, (int, float)) else np.nan
+            self.gateways[row, head] = self._gateway_code(gateway_id)
+            self.heads[row] = (head + 1) % self.depth
+            self.counts[row] = min(self.counts[row] + 1, self.depth)
+
+    def remove(self, dev_eui):
+        with self.lock:
+            row = self.rows.pop(dev_eui, None)
+            if row is not None:
+                self.counts[row] = 0
+                self.free_rows.append(row)
+
+    def prune(self, keep):
+        """Drop the history of every node whose dev_eui is not in keep."""
+        for dev_eui in [dev_eui for dev_eui in self.rows if dev_eui not in keep]:
+            self.remove(dev_eui)
+
+    def history(self, dev_eui):
+        """(timestamps, rssi, snr, gateway_ids) for one node, oldest first.
+
+        Unknown RSSI and SNR come back as NaN.
+        """
+        with self.lock:
+            row = self.rows.get(dev_eui)
+            if row is None:
+                return np.zeros(0), np.zeros(0), np.zeros(0), []
+            count = self.counts[row]
+            order = (self.heads[row] - count + np.arange(count)) % self.depth
+            rssi = self.rssi[row, order].astype(np.float64)
+            rssi[rssi == RSSI_UNKNOWN] = np.nan
+            gateways = [self.gateway_ids[code] for code in self.gateways[row, order]]
+            return self.timestamps[row, order], rssi, self.snr[row, order].astype(np.float64), gateways
+
+    def last_gateway(self, dev_eui):
+        """Gateway of the most recent reception from dev_eui, or None."""
+        with self.lock:
+            row = self.rows.get(dev_eui)
+            if row is None or not self.counts[row]:
+                return None
+            return self.gateway_ids[self.gateways[row, (self.heads[row] - 1) % self.depth]]
+
+    def node_stats(self, dev_eui, window=None, now=None, percentiles=(10, 50, 90)):
+        """fleet_stats() for a single node, as a dict of scalars without 'dev_euis'.
+
+        Returns None if dev_eui has no history.
+        """
+        with self.lock:
+            if dev_eui not in self.rows:
+                return None
+        timestamps, rssi, snr, _ = self.history(dev_eui)
+        if window is not None:
+            recent = timestamps >= ((now or datetime.now()) - window).timestamp()
+            rssi, snr = rssi[recent], snr[recent]
+
+        stats = {'count': len(rssi)}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for name, values in (('rssi', rssi), ('snr', snr)):
+                known = values[~np.isnan(values)]
+                stats[f'{name}_mean'] = known.mean() if len(known) else np.nan
+                stats[f'{name}_min'] = known.min() if len(known) else np.nan
+                for percentile in percentiles:
+                    stats[f'{name}_p{percentile}'] = np.percentile(known, percentile) if len(known) else np.nan
+        return stats
+
+    def fleet_stats(self, window=None, now=None, percentiles=(10, 50, 90)):
+        """Rolling link statistics for every node in one vectorized pass.
+
+        Only entries newer than window (a timedelta) count, if given. Returns a
+        dict of equal-length arrays keyed 'dev_euis', 'count', 'rssi_mean',
+        'rssi_min', 'snr_mean', 'snr_min' and 'rssi_p<N>' / 'snr_p<N>' for each
+        requested percentile; nodes without usable entries get NaN.
+        """
+        with self.lock:
+            dev_euis = list(self.rows)
+            rows = np.fromiter(self.rows.values(), dtype=np.intp, count=len(dev_euis))
+            valid = np.arange(self.depth) < self.counts[rows, None]
+            if window is not None:
+                cutoff = ((now or datetime.now()) - window).timestamp()
+                valid &= self.timestamps[rows] >= cutoff
+            rssi = self.rssi[rows].astype(np.float64)
+            rssi[~valid | (rssi == RSSI_UNKNOWN)] = np.nan
+            snr = self.snr[rows].astype(np.float64)
+            snr[~valid] = np.nan
+
+        stats = {'dev_euis': dev_euis, 'count': valid.sum(axis=1)}
+        with warnings.catch_warnings():
+            # Rows without data produce NaN, which is what we want
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for name, values in (('rssi', rssi), ('snr', snr)):
+                stats[f'{name}_mean'] = np.nanmean(values, axis=1)
+                stats[f'{name}_min'] = np.nanmin(values, axis=1)
+                if percentiles and len(dev_euis):
+                    for percentile, column in zip(percentiles, np.nanpercentile(values, percentiles, axis=1)):
+                        stats[f'{name}_p{percentile}'] = column
+                else:
+                    for percentile in percentiles:
+                        stats[f'{name}_p{percentile}'] = np.full(len(dev_euis), np.nan)
+        return stats
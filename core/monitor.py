@@ -0,0 +1,438 @@
+import itertools
+import threading
+import time
+from datetime import datetime
+from .event_store import Event, EventStore
+from .link_history import LinkHistory
+from .node_manager import NodeManager
+from .offline_scheduler import OfflineScheduler
+from .snapshot import save_snapshot, snapshot_rows
+from networking.alert_broadcaster import AlertBroadcaster
+from networking.alert_coalescer import AlertCoalescer
+from networking.downlink_campaign import CampaignScheduler
+from networking.mqtt_client import MQTTClient
+from networking.mqtt_workers import DEFAULT_SHARE_GROUP, ShardedMQTTClient
+from utils.logging_utils import logger
+
+ALERT_TARGET_TYPES = ("Sound Unit", "Wearable Alert Unit", "LiDAR unit")
+MQTT_BATCH_SIZE = 500  # max messages handled per pass of the monitor thread
+MQTT_WAIT = 0.2  # seconds the monitor thread waits for a message before checking deadlines
+EVENT_STORE_CAPACITY = 10000  # most recent events kept in memory
+OFFLINE_CHECK_INTERVAL = 5.0  # seconds between offline deadline checks
+SNAPSHOT_INTERVAL = 300.0  # seconds between snapshot saves while running
+
+
+class Monitor:
+    """Node state, MQTT ingestion and the alert response, without any UI.
+
+    After start() a monitor thread applies MQTT events and offline deadlines to
+    the NodeManager, so alerts are answered however busy a UI is. State is
+    changed only under self.lock. Every change bumps version; UIs and the HTTP
+    service call deltas_since() with the last version they saw to learn which
+    nodes to redraw.
+    """
+
+    def __init__(self, chirpstack_client, mqtt_config, offline_timeouts=None, history_store=None, snapshot_path=None,
+                 alert_options=None, primary=True):
+        self.chirpstack_client = chirpstack_client
+        self.snapshot_path = snapshot_path  # Inventory and node state saved for the next warm start
+        self.history_store = history_store  # Durable copy of every recorded event, if configured
+        self.offline_scheduler = OfflineScheduler(offline_timeouts)
+        self.node_manager = NodeManager(self.offline_scheduler.timeout_for)
+        self.event_store = EventStore(EVENT_STORE_CAPACITY)
+        self.link_history = LinkHistory()
+        self.alert_broadcaster = AlertBroadcaster(chirpstack_client)
+        self.alert_coalescer = AlertCoalescer(**(alert_options or {}))
+        # False while a monitor service runs: it answers alerts and stores history and the
+        # snapshot, so this monitor only follows the events (see set_primary())
+        self.primary = primary
+        self.campaign_scheduler = CampaignScheduler(chirpstack_client, gateway_of=self.link_history.last_gateway)
+        self.lock = threading.RLock()
+        self.version = 0
+        self.layout_version = 0  # version of the last change to the set of nodes
+        self.changed = {}  # dev_eui -> version of its last change, oldest first
+        self.thread = None
+        self._stopping = threading.Event()
+
+        # Events of other types are dropped by the MQTT client before their payload is decoded
+        self.event_handlers = {
+            "up": self.handle_uplink,
+            "join": self.handle_join,
+            "status": self.handle_status,
+            "ack": self.handle_ack,
+            "txack": self.handle_txack,
+            "log": self.handle_log,
+        }
+        mqtt_options = {
+            'event_types': self.event_handlers,
+            'decoder': mqtt_config.get('decoder'),
+            'app_ids': mqtt_config.get('app_ids') or [chirpstack_client.app_id],
+        }
+        if mqtt_config.get('workers'):
+            self.mqtt_client = ShardedMQTTClient(mqtt_config['broker'], mqtt_config['port'], self.handle_mqtt_message,
+                                                 workers=mqtt_config['workers'],
+                                                 share_group=mqtt_config.get('share_group') or DEFAULT_SHARE_GROUP,
+                                                 **mqtt_options)
+        else:
+            self.mqtt_client = MQTTClient(mqtt_config['broker'], mqtt_config['port'], self.handle_mqtt_message,
+                                          **mqtt_options)
+
+    def start(self):
+        self.mqtt_client.connect()
+        self.thread = threading.Thread(target=self._run, name="monitor", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self.thread:
+            self.thread.join()
+        self.mqtt_client.disconnect()
+        logger.log("MQTT client disconnected")
+        self.alert_broadcaster.shutdown()
+        self.campaign_scheduler.shutdown()
+        self.save_snapshot()
+
+    def _run(self):
+        next_offline_check = time.monotonic() + OFFLINE_CHECK_INTERVAL
+        next_snapshot = time.monotonic() + SNAPSHOT_INTERVAL
+        while not self._stopping.is_set():
+            dispatched = self.mqtt_client.dispatch_pending(MQTT_BATCH_SIZE, timeout=MQTT_WAIT)
+            if dispatched == MQTT_BATCH_SIZE:
+                logger.debug("MQTT ingest backlog: %s", self.mqtt_client.get_metrics())
+            if time.monotonic() >= next_offline_check:
+                self.check_offline_nodes()
+                next_offline_check = time.monotonic() + OFFLINE_CHECK_INTERVAL
+            if time.monotonic() >= next_snapshot:
+                self.save_snapshot()
+                next_snapshot = time.monotonic() + SNAPSHOT_INTERVAL
+
+    def mark_changed(self, node):
+        self.version += 1
+        self.changed.pop(node.dev_eui, None)
+        self.changed[node.dev_eui] = self.version
+
+    def mark_layout_changed(self):
+        self.version += 1
+        self.layout_version = self.version
+
+    def _mark_all_changed(self):
+        # A reload updates the existing EndNode objects in place, so tiles bound to
+        # them only learn about the new state through these deltas
+        for node in self.node_manager.iter_nodes():
+            self.mark_changed(node)
+
+    def deltas_since(self, since):
+        """(version, layout_changed, dev_euis of nodes changed after version since)."""
+        with self.lock:
+            changed = []
+            for dev_eui, version in reversed(self.changed.items()):
+                if version <= since:
+                    break
+                changed.append(dev_eui)
+            return self.version, self.layout_version > since, changed
+
+    def set_primary(self, primary):
+        if primary != self.primary:
+            self.primary = primary
+            logger.log("Answering alerts here" if primary else "Alert downlinks and history left to the monitor service")
+
+    def load_nodes(self, devices):
+        with self.lock:
+            self.node_manager.load_nodes_from_chirpstack(devices)
+            self.offline_scheduler.reset(self.node_manager.iter_nodes())
+            self.link_history.prune(self.node_manager.nodes)
+            self.alert_coalescer.prune(self.node_manager.nodes)
+            self.changed = {}
+            self.mark_layout_changed()
+            self._mark_all_changed()
+        self.check_offline_nodes()
+        self.save_snapshot()
+
+    def stream_nodes(self, devices, on_batch=None, batch_size=100):
+        """load_nodes() for a slow iterable such as ChirpStackClient.iter_devices().
+
+        Runs on a worker thread: the lock is only held to apply each batch, not
+        while devices fetches the next page, and on_batch(nodes) is called from
+        this thread. If devices raises, the nodes loaded so far are kept, none
+        are removed and the error is re-raised.
+        """
+        logger.info("Loading devices from ChirpStack")
+        seen = set()
+        devices = iter(devices)
+        complete = False
+        try:
+            while True:
+                batch = list(itertools.islice(devices, batch_size))
+                if not batch:
+                    complete = True
+                    break
+                with self.lock:
+                    nodes = [self.node_manager.load_device(device) for device in batch]
+                seen.update(node.dev_eui for node in nodes)
+                if on_batch:
+                    on_batch(nodes)
+        finally:
+            with self.lock:
+                if complete:
+                    self.node_manager.remove_nodes_except(seen)
+                self.offline_scheduler.reset(self.node_manager.iter_nodes())
+                self.link_history.prune(self.node_manager.nodes)
+                self.alert_coalescer.prune(self.node_manager.nodes)
+                self.changed = {}
+                self.mark_layout_changed()
+                self._mark_all_changed()
+            self.check_offline_nodes()
+        logger.info("Finished loading %d nodes", len(seen))
+        self.save_snapshot()
+
+    def load_snapshot(self, entries):
+        # Warm start: show the last known state now, reconcile_in_background() corrects it
+        with self.lock:
+            self.node_manager.load_snapshot(entries)
+            self.offline_scheduler.reset(self.node_manager.iter_nodes())
+            self.link_history.prune(self.node_manager.nodes)
+            self.alert_coalescer.prune(self.node_manager.nodes)
+            self.changed = {}
+            self.mark_layout_changed()
+            self._mark_all_changed()
+        self.check_offline_nodes()
+
+    def save_snapshot(self):
+        if not self.snapshot_path or not self.primary:
+            return
+        with self.lock:
+            rows = snapshot_rows(self.node_manager.iter_nodes())
+        save_snapshot(self.snapshot_path, self.chirpstack_client.server, self.chirpstack_client.app_id, rows)
+
+    def reconcile(self, devices):
+        with self.lock:
+            added, removed, updated = self.node_manager.reconcile_with_chirpstack(devices)
+            for dev_eui in removed:
+                self.offline_scheduler.remove(dev_eui)
+                self.link_history.remove(dev_eui)
+                self.alert_coalescer.forget(dev_eui)
+                self.changed.pop(dev_eui, None)
+            for dev_eui in added + updated:
+                node = self.node_manager.get_node(dev_eui)
+                self.offline_scheduler.touch(node)
+                self.mark_changed(node)
+            if added or removed:
+                self.mark_layout_changed()
+        self.check_offline_nodes()
+        self.save_snapshot()
+
+    def reconcile_in_background(self, on_complete=None):
+        """Reconcile with ChirpStack's inventory on a worker thread.
+
+        on_complete(error) is called from that thread with None on success, or with
+        the exception if the server could not be reached or rejected the token.
+        """
+        threading.Thread(target=self._reconcile_from_chirpstack, args=(on_complete,), name="reconcile",
+                         daemon=True).start()
+
+    def _reconcile_from_chirpstack(self, on_complete=None):
+        error = None
+        try:
+            self.reconcile(self.chirpstack_client.list_devices(self.chirpstack_client.app_id))
+        except Exception as e:
+            error = e
+            logger.log(f"Error reconciling nodes with ChirpStack: {str(e)}")
+        if on_complete:
+            on_complete(error)
+
+    def add_node(self, dev_eui, name, device_type):
+        with self.lock:
+            node = self.node_manager.add_node(dev_eui, name, device_type)
+            self.mark_layout_changed()
+            return node
+
+    def add_nodes(self, entries):
+        # Bulk import: one layout change however many nodes arrive
+        with self.lock:
+            nodes = self.node_manager.add_nodes(entries)
+            if nodes:
+                self.mark_layout_changed()
+        self.save_snapshot()
+        return nodes
+
+    def remove_node(self, dev_eui):
+        with self.lock:
+            self.node_manager.remove_node(dev_eui)
+            self.offline_scheduler.remove(dev_eui)
+            self.link_history.remove(dev_eui)
+            self.alert_coalescer.forget(dev_eui)
+            self.changed.pop(dev_eui, None)
+            self.mark_layout_changed()
+
+    def clear_alert(self, node):
+        with self.lock:
+            node.clear_alert(self.offline_scheduler.timeout_for(node.device_type))
+            # set_offline() is ignored during an alert, so the deadline may have lapsed meanwhile
+            self.offline_scheduler.touch(node)
+            self.mark_changed(node)
+
+    def check_offline_nodes(self):
+        # Only nodes whose offline deadline has passed are visited
+        try:
+            with self.lock:
+                for dev_eui in self.offline_scheduler.pop_expired(datetime.now()):
+                    node = self.node_manager.get_node(dev_eui)
+                    if node:
+                        node.set_offline()
+                        self.mark_changed(node)
+        except Exception as e:
+            logger.log(f"Error checking offline nodes: {str(e)}")
+
+    def handle_mqtt_message(self, event):
+        logger.debug("Received %s event for %s", event.event_type, event.dev_eui)
+        handler = self.event_handlers.get(event.event_type)
+        if handler:
+            with self.lock:
+                handler(event)
+        else:
+            logger.log(f"Unknown event type: {event.event_type}")
+
+    def handle_uplink(self, event):
+        dev_eui = event.dev_eui
+        message = event.message or 'No message'
+
+        node = self.node_manager.get_node(dev_eui)
+        if node:
+            logger.debug("Handling uplink for node: %s", node.name)
+            node.update_last_seen()
+            self.offline_scheduler.touch(node)
+            if event.rssi is not None:
+                self.link_history.record(dev_eui, node.last_seen, event.rssi, event.snr, event.gateway_id)
+            if "Alert" in message:
+                node.set_alert()
+                self.handle_alert(node, message)
+            elif not node.has_alert:  # Only update status if there's no active alert
+                node.update_status("Online", datetime.now(), event.rssi, event.snr)
+                self.handle_normal_uplink(node, message)
+            self.mark_changed(node)
+        else:
+            logger.info("Node not found for DevEUI: %s", dev_eui)
+
+        self.record_event("Uplink", dev_eui, event.device_name, message, rssi=event.rssi, snr=event.snr,
+                          payload=event.data, ingested=True)
+
+    def handle_alert(self, node, message):
+        self.record_event("Alert", node.dev_eui, node.name, message, is_alert=True, ingested=True)
+
+        # Send 0xFF to Sound Unit and Wearable Alert Unit devices that don't already have one on the way
+        targets = [alert_node for alert_node in self.node_manager.iter_nodes()
+                   if alert_node.device_type in ALERT_TARGET_TYPES]
+        if not self.primary:
+            logger.debug("Alert from %s left to the monitor service", node.name)
+            return
+        targets, replace = self.alert_coalescer.select(targets)
+        if not targets:
+            logger.debug("Alert from %s coalesced with the previous broadcast", node.name)
+            return
+        self.alert_broadcaster.broadcast(targets, bytes([0xFF]), self.on_alert_broadcast_complete, replace)
+
+    def on_alert_broadcast_complete(self, result):
+        # Called from the broadcaster thread; the event store and logger are thread-safe
+        for alert_node in result.succeeded:
+            self.alert_coalescer.on_sent(alert_node.dev_eui, True, result.queue_item_ids.get(alert_node.dev_eui))
+            action = "Alert Response (replaced stale)" if alert_node.dev_eui in result.replace else "Alert Response"
+            self.record_event("Downlink", alert_node.dev_eui, alert_node.name, f"[0xFF] - {action}")
+        for alert_node, message in result.failed:
+            self.alert_coalescer.on_sent(alert_node.dev_eui, False)
+            self.record_event("Downlink Failed", alert_node.dev_eui, alert_node.name, f"[0xFF] - {message}")
+        self.record_event("Alert Broadcast", message=result.summary(), is_alert=True)
+
+    def start_campaign(self, data, device_types=None, statuses=None):
+        """Send data to every node of the given types and statuses (None matches all)."""
+        with self.lock:
+            nodes = [node for node in self.node_manager.iter_nodes()
+                     if (device_types is None or node.device_type in device_types)
+                     and (statuses is None or node.status in statuses)]
+        campaign = self.campaign_scheduler.submit(nodes, data, on_result=self.on_campaign_result,
+                                                  on_complete=self.on_campaign_complete)
+        self.record_event("Campaign", message=f"{campaign.name} [{data.hex()}] to {len(nodes)} devices started")
+        return campaign
+
+    def on_campaign_result(self, campaign, node, success, message):
+        # Called from the campaign scheduler thread
+        if success:
+            self.record_event("Downlink", node.dev_eui, node.name, f"[{campaign.data.hex()}] - {campaign.name}")
+        else:
+            self.record_event("Downlink Failed", node.dev_eui, node.name, f"[{campaign.data.hex()}] - {message}")
+
+    def on_campaign_complete(self, campaign):
+        self.record_event("Campaign", message=campaign.summary())
+
+    def handle_normal_uplink(self, node, message):
+        logger.debug("Uplink received from device %s - %s", node.name, message)
+
+    def handle_status_message(self, device_name, message):
+        self.record_event("Status", device_name=device_name, message=message, is_alert=True)
+
+    def handle_data_message(self, device_name, message):
+        self.record_event("Data", device_name=device_name, message=message, is_alert=True)
+
+    def handle_reset_message(self, device_name, message):
+        self.record_event("Reset", device_name=device_name, message=message, is_alert=True)
+
+    def handle_join(self, event):
+        self.record_event("Join", event.dev_eui, event.device_name, ingested=True)
+
+    def handle_status(self, event):
+        margin = event.fields.get('margin', 'N/A')
+        battery = event.fields.get('batteryLevel', 'N/A')
+        external_power = event.fields.get('externalPowerSource', False)
+        last_seen = event.fields.get('lastSeenAt', 'N/A')
+
+        status = f"Margin: {margin}, Battery: {battery}, External Power: {external_power}, Last Seen: {last_seen}"
+        self.record_event("Status", event.dev_eui, event.device_name, status, ingested=True)
+
+    def handle_ack(self, event):
+        acknowledged = event.fields.get('acknowledged', False)
+        self.record_event("ACK", event.dev_eui, event.device_name, f"Acknowledged: {acknowledged}", ingested=True)
+
+    def handle_txack(self, event):
+        self.alert_coalescer.on_transmitted(event.dev_eui, event.fields.get('queueItemId'))
+        self.record_event("TXACK", event.dev_eui, event.device_name, ingested=True)
+
+    def handle_log(self, event):
+        level = event.fields.get('level', 'Unknown level')
+        self.record_event("Log", event.dev_eui, event.device_name, f"Level: {level}, {event.message or 'No message'}",
+                          ingested=True)
+
+    def record_event(self, event_type, dev_eui=None, device_name=None, message=None, rssi=None, snr=None,
+                     is_alert=False, payload=None, ingested=False):
+        event = self.event_store.append(Event(event_type, dev_eui, device_name, message, rssi, snr, is_alert))
+        # Events received over MQTT are already stored by the monitor service unless this is the primary
+        if self.history_store and (self.primary or not ingested):
+            self.history_store.add(event, payload)
+        # The event is only formatted if the log level lets the line through
+        if is_alert:
+            logger.alert("%s", event)
+        else:
+            logger.info("%s", event)
+        return event
+
+    @staticmethod
+    def node_state(node):
+        return {
+            'dev_eui': node.dev_eui,
+            'name': node.name,
+            'device_type': node.device_type,
+            'status': node.status,
+            'last_seen': node.last_seen.isoformat() if node.last_seen else None,
+            'rssi': node.rssi,
+            'snr': node.snr,
+            'has_alert': node.has_alert,
+        }
+
+    def get_nodes_state(self, dev_euis=None):
+        with self.lock:
+            if dev_euis is None:
+                return [self.node_state(node) for node in self.node_manager.iter_nodes()]
+            nodes = (self.node_manager.get_node(dev_eui) for dev_eui in dev_euis)
+            return [self.node_state(node) for node in nodes if node]
+
+    def count_by_status(self):
+        with self.lock:
+            return self.node_manager.count_by_status()
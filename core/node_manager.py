@@ -1,27 +1,121 @@
-from .end_node import EndNode
+from datetime import datetime
+from .node_store import NodeStore
+from .offline_scheduler import DEFAULT_OFFLINE_TIMEOUT
 from utils.logging_utils import logger
 
 
+def parse_timestamp(value):
+    """Convert a ChirpStack RFC 3339 timestamp (e.g. lastSeenAt) to a naive local datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone().replace(tzinfo=None)
+    except ValueError:
+        logger.info("Invalid timestamp from ChirpStack: %s", value)
+        return None
+
+
 class NodeManager:
-    def __init__(self):
-        self.nodes = {}
+    def __init__(self, timeout_for=None):
+        self.store = NodeStore()
+        # device_type -> offline timeout; Monitor passes its OfflineScheduler's so both agree
+        self.timeout_for = timeout_for or (lambda device_type: DEFAULT_OFFLINE_TIMEOUT)
+
+    @property
+    def nodes(self):
+        return self.store.nodes
 
     def load_nodes_from_chirpstack(self, devices):
-        self.nodes = {}
-        logger.log(f"Loading {len(devices)} devices from ChirpStack")
+        """Load nodes from any iterable of device dicts; Monitor.stream_nodes() handles slow ones."""
+        logger.info("Loading devices from ChirpStack")
+        seen = {self.load_device(device).dev_eui for device in devices}
+        self.remove_nodes_except(seen)
+        logger.info("Finished loading %d nodes", len(self.nodes))
+
+    def load_device(self, device):
+        """Add or update the node for one ChirpStack device dict and return it."""
+        dev_eui = device['devEui']
+        name = device['name']
+        device_type = device.get('description', 'Unknown')
+        last_seen = parse_timestamp(device.get('lastSeenAt'))
+        node = self.store.get(dev_eui)
+        if node is None:
+            node = self.store.add(dev_eui, name, device_type)
+        else:
+            # Reuse the existing view so tiles and dialogs holding it stay valid
+            node.name = name
+            node.device_type = device_type
+            node.has_alert = False
+        if last_seen:
+            node.last_seen = last_seen  # is_online() needs it before the status is set
+            node.update_status("Online" if self.is_online(node) else "Offline", last_seen)
+        else:
+            node.update_status("Never seen", None)
+        logger.debug("Loaded node: %s (EUI: %s, Type: %s, Last seen: %s)", name, dev_eui, device_type, last_seen)
+        return node
+
+    def remove_nodes_except(self, keep):
+        for dev_eui in [dev_eui for dev_eui in self.nodes if dev_eui not in keep]:
+            self.store.remove(dev_eui)
+
+    def load_snapshot(self, entries):
+        """Replace the nodes with the state saved by core.snapshot.save_snapshot()."""
+        for dev_eui in list(self.nodes):
+            self.store.remove(dev_eui)
+        for entry in entries:
+            node = self.store.add(entry['dev_eui'], entry['name'], entry['device_type'])
+            node.status = entry['status']
+            node.last_seen = datetime.fromtimestamp(entry['last_seen']) if entry['last_seen'] else None
+            node.rssi = entry['rssi']
+            node.snr = entry['snr']
+            node.has_alert = entry['has_alert']
+        logger.info("Loaded %d nodes from snapshot", len(self.nodes))
+
+    def reconcile_with_chirpstack(self, devices):
+        """Apply only the differences between the current nodes and a ChirpStack listing.
+
+        Nodes that are unchanged keep all their state, alerts included. Returns
+        (added, removed, updated) lists of dev_euis.
+        """
+        seen = set()
+        added, updated = [], []
         for device in devices:
             dev_eui = device['devEui']
             name = device['name']
             device_type = device.get('description', 'Unknown')
-            last_seen = device.get('lastSeenAt')
-            node = EndNode(dev_eui, name, device_type)
-            if last_seen:
-                node.update_status("Online" if node.is_online() else "Offline", last_seen)
-            else:
-                node.update_status("Never seen", None)
-            self.nodes[dev_eui] = node
-            logger.log(f"Loaded node: {name} (EUI: {dev_eui}, Type: {device_type}, Last seen: {last_seen})")
-        logger.log(f"Finished loading {len(self.nodes)} nodes")
+            last_seen = parse_timestamp(device.get('lastSeenAt'))
+            seen.add(dev_eui)
+            node = self.store.get(dev_eui)
+            if node is None:
+                node = self.store.add(dev_eui, name, device_type)
+                if last_seen:
+                    node.last_seen = last_seen
+                    node.update_status("Online" if self.is_online(node) else "Offline", last_seen)
+                else:
+                    node.update_status("Never seen", None)
+                added.append(dev_eui)
+                continue
+            changed = False
+            if node.name != name or node.device_type != device_type:
+                node.name = name
+                node.device_type = device_type
+                changed = True
+            if last_seen and (node.last_seen is None or last_seen > node.last_seen):
+                node.last_seen = last_seen
+                if not node.has_alert:
+                    node.status = "Online" if self.is_online(node) else "Offline"
+                changed = True
+            if changed:
+                updated.append(dev_eui)
+        removed = [dev_eui for dev_eui in self.nodes if dev_eui not in seen]
+        for dev_eui in removed:
+            self.store.remove(dev_eui)
+        logger.info("Reconciled with ChirpStack: %d added, %d removed, %d updated", len(added), len(removed),
+                    len(updated))
+        return added, removed, updated
+
+    def is_online(self, node):
+        return node.is_online(self.timeout_for(node.device_type))
 
     def get_device_type(self, device):
         return device.get('description', 'Blank Unit')
@@ -29,15 +123,28 @@ class NodeManager:
     def get_all_nodes(self):
         return list(self.nodes.values())
 
+    def iter_nodes(self):
+        # No copy; don't add or remove nodes while iterating
+        return self.nodes.values()
+
+    def count_by_status(self):
+        return self.store.count_by_status()
+
     def add_node(self, dev_eui, name, device_type):
-        node = EndNode(dev_eui=dev_eui, name=name, device_type=device_type)
-        self.nodes[dev_eui] = node
+        node = self.store.add(dev_eui, name, device_type)
         logger.log(f"Node {name} ({dev_eui}) added to NodeManager")
         return node
 
+    def add_nodes(self, entries):
+        """Add (dev_eui, name, device_type) entries, skipping nodes already present."""
+        added = [self.store.add(dev_eui, name, device_type) for dev_eui, name, device_type in entries
+                 if dev_eui not in self.nodes]
+        logger.log(f"{len(added)} nodes added to NodeManager")
+        return added
+
     def remove_node(self, dev_eui):
         if dev_eui in self.nodes:
-            node = self.nodes.pop(dev_eui)
+            node = self.store.remove(dev_eui)
             logger.log(f"Node {node.name} ({dev_eui}) removed from NodeManager")
         else:
             logger.log(f"Attempted to remove non-existent node: {dev_eui}")
@@ -0,0 +1,100 @@
+import numpy as np
+from .end_node import EndNode, RSSI_UNKNOWN
+
+STATUSES = ("Unknown", "Online", "Offline", "Alert", "Never seen")
+
+
+class NodeStore:
+    """Columnar node state: one integer slot per dev_eui.
+
+    Status (interned to an int8 code), last_seen (epoch seconds, NaN if never),
+    RSSI (int16), SNR (float32, NaN if unknown) and the alert flag live in NumPy
+    arrays, about 17 bytes per node. EndNode objects are thin __slots__ views onto
+    a slot, and whole-fleet operations work on the arrays directly.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = 0
+        self.status = np.zeros(0, dtype=np.int8)
+        self.last_seen = np.zeros(0, dtype=np.float64)
+        self.rssi = np.zeros(0, dtype=np.int16)
+        self.snr = np.zeros(0, dtype=np.float32)
+        self.has_alert = np.zeros(0, dtype=bool)
+        self.in_use = np.zeros(0, dtype=bool)
+        self.status_names = list(STATUSES)
+        self.status_codes = {status: code for code, status in enumerate(STATUSES)}
+        self.nodes = {}  # dev_eui -> EndNode, in insertion order
+        self.views = []  # slot -> EndNode or None
+        self.free_slots = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        self.status = np.concatenate([self.status, np.zeros(extra, dtype=np.int8)])
+        self.last_seen = np.concatenate([self.last_seen, np.full(extra, np.nan)])
+        self.rssi = np.concatenate([self.rssi, np.full(extra, RSSI_UNKNOWN, dtype=np.int16)])
+        self.snr = np.concatenate([self.snr, np.full(extra, np.nan, dtype=np.float32)])
+        self.has_alert = np.concatenate([self.has_alert, np.zeros(extra, dtype=bool)])
+        self.in_use = np.concatenate([self.in_use, np.zeros(extra, dtype=bool)])
+        self.views.extend([None] * extra)
+        self.free_slots.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def status_code(self, status):
+        code = self.status_codes.get(status)
+        if code is None:
+            code = len(self.status_names)
+            self.status_names.append(status)
+            self.status_codes[status] = code
+        return code
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, dev_eui):
+        return dev_eui in self.nodes
+
+    def get(self, dev_eui):
+        return self.nodes.get(dev_eui)
+
+    def add(self, dev_eui, name, device_type):
+        if dev_eui in self.nodes:
+            self.remove(dev_eui)
+        return EndNode(dev_eui, name, device_type, store=self)
+
+    def attach(self, node):
+        # Give node a fresh slot in this store; called by EndNode
+        if not self.free_slots:
+            self._grow(max(1, self.capacity * 2))
+        slot = self.free_slots.pop()
+        self._reset_slot(slot)
+        self.in_use[slot] = True
+        self.views[slot] = node
+        self.nodes[node.dev_eui] = node
+        node.store = self
+        node.slot = slot
+
+    def remove(self, dev_eui):
+        node = self.nodes.pop(dev_eui, None)
+        if node is None:
+            return None
+        slot = node.slot
+        # Move the removed node onto its own store so views still held elsewhere
+        # (open dialogs, pending broadcasts) don't see the slot's next occupant
+        node.detach()
+        self.views[slot] = None
+        self.in_use[slot] = False
+        self._reset_slot(slot)
+        self.free_slots.append(slot)
+        return node
+
+    def _reset_slot(self, slot):
+        self.status[slot] = 0
+        self.last_seen[slot] = np.nan
+        self.rssi[slot] = RSSI_UNKNOWN
+        self.snr[slot] = np.nan
+        self.has_alert[slot] = False
+
+    def count_by_status(self):
+        codes, counts = np.unique(self.status[self.in_use], return_counts=True)
+        return {self.status_names[code]: int(count) for code, count in zip(codes, counts)}
@@ -0,0 +1,61 @@
+import heapq
+from datetime import timedelta
+
+DEFAULT_OFFLINE_TIMEOUT = timedelta(minutes=10)
+
+
+class OfflineScheduler:
+    """Min-heap of offline deadlines, one per node (last_seen + timeout for its type).
+
+    touch() records a new deadline in O(log n); the entry it supersedes stays in the
+    heap and is skipped when it surfaces. pop_expired() only visits entries whose
+    deadline has passed, so a check costs nothing when no node has gone quiet.
+    """
+
+    def __init__(self, timeouts=None, default_timeout=DEFAULT_OFFLINE_TIMEOUT):
+        self.timeouts = timeouts or {}  # device_type -> timedelta
+        self.default_timeout = default_timeout
+        self.heap = []  # (deadline, dev_eui), may contain superseded entries
+        self.deadlines = {}  # dev_eui -> current deadline
+
+    def timeout_for(self, device_type):
+        return self.timeouts.get(device_type, self.default_timeout)
+
+    def touch(self, node):
+        if node.last_seen is None:
+            self.remove(node.dev_eui)
+            return
+        deadline = node.last_seen + self.timeout_for(node.device_type)
+        self.deadlines[node.dev_eui] = deadline
+        heapq.heappush(self.heap, (deadline, node.dev_eui))
+        if len(self.heap) > 4 * len(self.deadlines) + 1024:
+            self._compact()
+
+    def remove(self, dev_eui):
+        self.deadlines.pop(dev_eui, None)
+
+    def reset(self, nodes):
+        self.heap = []
+        self.deadlines = {}
+        for node in nodes:
+            self.touch(node)
+
+    def pop_expired(self, now):
+        """dev_euis whose deadline is at or before now; they are no longer scheduled."""
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, dev_eui = heapq.heappop(self.heap)
+            if self.deadlines.get(dev_eui) == deadline:
+                del self.deadlines[dev_eui]
+                expired.append(dev_eui)
+        return expired
+
+    def next_deadline(self):
+        while self.heap and self.deadlines.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def _compact(self):
+        # Drop superseded entries once they outnumber live ones
+        self.heap = [(deadline, dev_eui) for dev_eui, deadline in self.deadlines.items()]
+        heapq.heapify(self.heap)
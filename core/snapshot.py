@@ -0,0 +1,48 @@
+import json
+import os
+import time
+from utils.logging_utils import logger
+
+DEFAULT_SNAPSHOT_FILE = "snapshot.json"
+SNAPSHOT_FORMAT = 1
+FIELDS = ("dev_eui", "name", "device_type", "status", "last_seen", "rssi", "snr", "has_alert")
+
+
+def snapshot_rows(nodes):
+    """The state save_snapshot() stores for each node; last_seen as epoch seconds."""
+    return [[node.dev_eui, node.name, node.device_type, node.status,
+             node.last_seen.timestamp() if node.last_seen else None, node.rssi, node.snr, node.has_alert]
+            for node in nodes]
+
+
+def save_snapshot(path, server, app_id, rows):
+    """Write the inventory and last known state of nodes (snapshot_rows()) for the next launch.
+
+    The file is replaced atomically, so a crash mid-write leaves the previous
+    snapshot intact.
+    """
+    data = {'format': SNAPSHOT_FORMAT, 'server': server, 'app_id': app_id, 'saved_at': time.time(),
+            'fields': FIELDS, 'nodes': rows}
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.log(f"Failed to save snapshot {path}: {str(e)}")
+
+
+def load_snapshot(path, server, app_id):
+    """Node state dicts saved for app_id on server, or None if there is no usable snapshot."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.log(f"Ignoring unreadable snapshot {path}: {str(e)}")
+        return None
+    if data.get('format') != SNAPSHOT_FORMAT or data.get('server') != server or data.get('app_id') != app_id:
+        return None
+    fields = data['fields']
+    return [dict(zip(fields, row)) for row in data['nodes']]
@@ -31,19 +31,36 @@ class AddNodeDialog(tk.Toplevel):
         self.device_type.grid(column=1, row=2, sticky=(tk.W, tk.E))
 
         ttk.Label(frame, text="Device Profile:").grid(column=0, row=3, sticky=tk.W)
-        self.device_profiles = self.chirpstack_client.get_device_profiles()
-        self.device_profile = ttk.Combobox(frame, values=[profile['name'] for profile in self.device_profiles])
+        self.device_profiles = []
+        self.device_profile = ttk.Combobox(frame, values=[], state="disabled")
+        self.device_profile.set("Loading profiles...")
         self.device_profile.grid(column=1, row=3, sticky=(tk.W, tk.E))
+        self.chirpstack_client.get_device_profiles(callback=self.on_profiles_loaded,
+                                                   error_callback=self.on_profiles_error)
 
         ttk.Label(frame, text="Network Key (NwkKey):").grid(column=0, row=4, sticky=tk.W)
         self.nwk_key = ttk.Entry(frame, width=40)
         self.nwk_key.grid(column=1, row=4, sticky=(tk.W, tk.E))
 
-        ttk.Button(frame, text="Add Node", command=self.add_node).grid(column=1, row=5, sticky=tk.E)
+        self.add_button = ttk.Button(frame, text="Add Node", command=self.add_node)
+        self.add_button.grid(column=1, row=5, sticky=tk.E)
 
         for child in frame.winfo_children():
             child.grid_configure(padx=5, pady=5)
 
+    def on_profiles_loaded(self, profiles):
+        if not self.winfo_exists():
+            return
+        self.device_profiles = profiles
+        self.device_profile.configure(values=[profile['name'] for profile in profiles], state="normal")
+        self.device_profile.set("")
+
+    def on_profiles_error(self, error):
+        if not self.winfo_exists():
+            return
+        self.device_profile.set("")
+        messagebox.showerror("Error", f"Failed to load device profiles: {str(error)}", parent=self)
+
     def add_node(self):
         dev_eui = self.dev_eui.get()
         name = self.name.get()
@@ -60,23 +77,34 @@ class AddNodeDialog(tk.Toplevel):
             messagebox.showerror("Error", "Invalid device profile selected.")
             return
 
-        try:
-            success, message = self.chirpstack_client.add_device(
-                dev_eui, name, device_profile_id,
-                self.chirpstack_client.app_id, nwk_key, device_type
-            )
-            if success:
-                self.added_node = self.node_manager.add_node(dev_eui, name, device_type)
-                self.node_added = True
-                messagebox.showinfo("Success", f"Node {name} added successfully.")
-                logger.log(f"Node {name} ({dev_eui}) added successfully")
+        self.add_button.configure(state="disabled")
+        self.chirpstack_client.add_device(
+            dev_eui, name, device_profile_id,
+            self.chirpstack_client.app_id, nwk_key, device_type,
+            callback=lambda result: self.on_device_added(dev_eui, name, device_type, result),
+            error_callback=self.on_add_error
+        )
+
+    def on_device_added(self, dev_eui, name, device_type, result):
+        success, message = result
+        if success:
+            self.added_node = self.node_manager.add_node(dev_eui, name, device_type)
+            self.node_added = True
+            logger.log(f"Node {name} ({dev_eui}) added successfully")
+            if self.winfo_exists():
+                messagebox.showinfo("Success", f"Node {name} added successfully.", parent=self)
                 self.destroy()
-            else:
-                messagebox.showerror("Error", f"Failed to add node: {message}")
-                logger.log(f"Failed to add node {name} ({dev_eui}): {message}")
-        except Exception as e:
-            error_message = f"Unexpected error adding node: {str(e)}"
-            messagebox.showerror("Error", error_message)
-            logger.log(error_message)
+        else:
+            logger.log(f"Failed to add node {name} ({dev_eui}): {message}")
+            if self.winfo_exists():
+                messagebox.showerror("Error", f"Failed to add node: {message}", parent=self)
+                self.add_button.configure(state="normal")
 
         logger.log(f"AddNodeDialog closing. node_added: {self.node_added}")
+
+    def on_add_error(self, error):
+        error_message = f"Unexpected error adding node: {str(error)}"
+        logger.log(error_message)
+        if self.winfo_exists():
+            messagebox.showerror("Error", error_message, parent=self)
+            self.add_button.configure(state="normal")
@@ -0,0 +1,46 @@
+class BlinkClock:
+    """Single timer that blinks every alerting tile in phase.
+
+    Tiles join with add() and leave with discard(), both O(1). While at least
+    one tile is registered the clock ticks every interval ms and restyles all of
+    them in one pass; with no tiles it stops scheduling itself.
+    """
+
+    def __init__(self, master, interval=500, on_style="Red.TFrame", off_style="Gray.TFrame"):
+        self.master = master
+        self.interval = interval
+        self.on_style = on_style
+        self.off_style = off_style
+        self.tiles = set()
+        self.phase_on = True
+        self.after_id = None
+
+    @property
+    def current_style(self):
+        return self.on_style if self.phase_on else self.off_style
+
+    def add(self, tile):
+        self.tiles.add(tile)
+        if self.after_id is None:
+            self.after_id = self.master.after(self.interval, self.tick)
+
+    def discard(self, tile):
+        self.tiles.discard(tile)
+
+    def tick(self):
+        self.after_id = None
+        self.phase_on = not self.phase_on
+        style = self.current_style
+        for tile in list(self.tiles):
+            if tile.winfo_exists():
+                tile.configure(style=style)
+            else:
+                self.tiles.discard(tile)
+        if self.tiles:
+            self.after_id = self.master.after(self.interval, self.tick)
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+        self.tiles.clear()
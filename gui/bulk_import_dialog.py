@@ -0,0 +1,171 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from core.device_manifest import ManifestError, read_manifest, validate_manifest
+from networking.bulk_provisioner import BulkProvisioner, load_progress
+from utils.logging_utils import logger
+
+POLL_INTERVAL = 100  # ms between progress updates
+
+
+class BulkImportDialog(tk.Toplevel):
+    """Provision every device of a CSV or JSON manifest.
+
+    The whole manifest is validated against the tenant's device profiles and
+    the current nodes before anything is sent. Progress is kept next to the
+    manifest (<manifest>.progress), so importing the same file again after a
+    failure picks up where it stopped.
+    """
+
+    def __init__(self, parent, chirpstack_client, monitor):
+        super().__init__(parent)
+        self.chirpstack_client = chirpstack_client
+        self.monitor = monitor
+        self.title("Import Nodes")
+        self.profiles = None
+        self.manifest_path = None
+        self.rows = []
+        self.devices = []
+        self.provisioner = None
+        self.results = queue.SimpleQueue()
+        self.done = 0
+        self.after_id = None
+        self.setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.chirpstack_client.get_device_profiles(callback=self.on_profiles_loaded,
+                                                   error_callback=self.on_profiles_error)
+
+    def setup_ui(self):
+        frame = ttk.Frame(self, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        ttk.Button(frame, text="Choose Manifest...", command=self.choose_manifest).grid(column=0, row=0, sticky=tk.W)
+        self.summary = ttk.Label(frame, text="Columns: dev_eui, name, type, profile, nwk_key")
+        self.summary.grid(column=1, row=0, sticky=tk.W)
+
+        self.tree = ttk.Treeview(frame, columns=("line", "dev_eui", "name", "result"), show="headings", height=15)
+        for column, width in (("line", 50), ("dev_eui", 150), ("name", 150), ("result", 300)):
+            self.tree.heading(column, text=column.replace("_", " ").title())
+            self.tree.column(column, width=width, stretch=column == "result")
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(column=0, row=1, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(column=2, row=1, sticky=(tk.N, tk.S))
+
+        self.progress = ttk.Progressbar(frame, mode="determinate")
+        self.progress.grid(column=0, row=2, columnspan=2, sticky=(tk.W, tk.E))
+
+        self.import_button = ttk.Button(frame, text="Import", command=self.start_import, state="disabled")
+        self.import_button.grid(column=1, row=3, sticky=tk.E)
+
+        for child in frame.winfo_children():
+            child.grid_configure(padx=5, pady=5)
+
+    def on_profiles_loaded(self, profiles):
+        if not self.winfo_exists():
+            return
+        self.profiles = profiles
+        if self.manifest_path:
+            self.validate()
+
+    def on_profiles_error(self, error):
+        if not self.winfo_exists():
+            return
+        messagebox.showerror("Error", f"Failed to load device profiles: {str(error)}", parent=self)
+
+    def choose_manifest(self):
+        path = filedialog.askopenfilename(parent=self, title="Device Manifest",
+                                          filetypes=[("Manifests", "*.csv *.json"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            self.rows = read_manifest(path)
+        except ManifestError as e:
+            messagebox.showerror("Error", str(e), parent=self)
+            return
+        self.manifest_path = path
+        if self.profiles is None:
+            self.summary.configure(text="Loading device profiles...")
+        else:
+            self.validate()
+
+    def validate(self):
+        progress = load_progress(self.progress_path())
+        # Nodes added by an earlier run of this manifest are resumed, not rejected as duplicates
+        with self.monitor.lock:
+            existing = set(self.monitor.node_manager.nodes) - set(progress)
+        self.devices, errors = validate_manifest(self.rows, self.profiles, existing)
+        self.tree.delete(*self.tree.get_children())
+        rows = [(device['line'], device['dev_eui'], device['name'], "Ready") for device in self.devices]
+        rows += [(line, dev_eui, "", f"Invalid: {message}") for line, dev_eui, message in errors]
+        for line, dev_eui, name, result in sorted(rows):
+            self.tree.insert("", tk.END, iid=str(line), values=(line, dev_eui, name, result))
+        resumed = sum(1 for device in self.devices if device['dev_eui'] in progress)
+        text = f"{len(self.devices)} devices ready, {len(errors)} invalid"
+        if resumed:
+            text += f", {resumed} resumed from an earlier import"
+        self.summary.configure(text=text)
+        self.import_button.configure(state="normal" if self.devices else "disabled")
+
+    def progress_path(self):
+        return f"{self.manifest_path}.progress"
+
+    def start_import(self):
+        invalid = len(self.rows) - len(self.devices)
+        if invalid and not messagebox.askyesno(
+                "Import Nodes", f"{invalid} rows are invalid and will be skipped. Import the rest?", parent=self):
+            return
+        self.import_button.configure(state="disabled")
+        self.progress.configure(maximum=len(self.devices), value=0)
+        self.done = 0
+        self.provisioner = BulkProvisioner(self.monitor.chirpstack_client, self.devices, self.progress_path(),
+                                           on_result=self.results.put)
+        threading.Thread(target=self._run_import, args=(self.provisioner,), name="bulk-import", daemon=True).start()
+        self.after_id = self.after(POLL_INTERVAL, self.poll_results)
+
+    def _run_import(self, provisioner):
+        try:
+            provisioner.run()
+        except Exception as e:
+            logger.log(f"Bulk import failed: {str(e)}")
+        # All successful nodes join the grid in one layout update
+        self.monitor.add_nodes(provisioner.provisioned())
+        self.results.put(None)
+
+    def poll_results(self):
+        finished = False
+        while not self.results.empty():
+            result = self.results.get()
+            if result is None:
+                finished = True
+                break
+            self.done += 1
+            self.tree.set(str(result.device['line']), "result", result.message)
+        self.progress.configure(value=self.done)
+        self.summary.configure(text=f"{self.done} of {len(self.devices)} devices processed")
+        if finished:
+            self.after_id = None
+            self.on_import_finished()
+        else:
+            self.after_id = self.after(POLL_INTERVAL, self.poll_results)
+
+    def on_import_finished(self):
+        results = self.provisioner.results
+        succeeded = sum(result.success for result in results)
+        failed = len(results) - succeeded
+        self.summary.configure(text=f"{succeeded} devices provisioned, {failed} failed")
+        message = f"{succeeded} devices provisioned, {failed} failed."
+        if failed:
+            message += "\nImport the same manifest again to retry the failed devices."
+        messagebox.showinfo("Import Nodes", message, parent=self)
+
+    def on_close(self):
+        if self.provisioner and self.after_id:
+            self.provisioner.cancel()
+            self.after_cancel(self.after_id)
+        self.destroy()
@@ -0,0 +1,114 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from networking.downlink_campaign import COMMANDS
+
+POLL_INTERVAL = 500  # ms between progress updates
+
+
+class CampaignDialog(tk.Toplevel):
+    """Send a command to every node of the selected types and statuses.
+
+    The campaign runs in the monitor's background scheduler, paced per gateway
+    and per device; closing the dialog doesn't stop it. Results also go to the
+    event log.
+    """
+
+    def __init__(self, parent, monitor):
+        super().__init__(parent)
+        self.monitor = monitor
+        self.title("Group Command")
+        self.campaign = None
+        self.after_id = None
+        with monitor.lock:
+            nodes = list(monitor.node_manager.iter_nodes())
+            self.device_types = sorted({node.device_type for node in nodes})
+            self.statuses = sorted({node.status for node in nodes})
+        self.setup_ui()
+        self.update_match_count()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def setup_ui(self):
+        frame = ttk.Frame(self, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        ttk.Label(frame, text="Command:").grid(column=0, row=0, sticky=tk.W)
+        self.command = ttk.Combobox(frame, values=list(COMMANDS.values()), state="readonly")
+        self.command.current(0)
+        self.command.grid(column=1, row=0, sticky=(tk.W, tk.E))
+
+        self.type_vars = self.add_checkbuttons(frame, 1, "Device Types", self.device_types)
+        self.status_vars = self.add_checkbuttons(frame, 2, "Statuses", self.statuses)
+
+        self.match_label = ttk.Label(frame, text="")
+        self.match_label.grid(column=0, row=3, columnspan=2, sticky=tk.W)
+
+        self.progress = ttk.Progressbar(frame, mode="determinate")
+        self.progress.grid(column=0, row=4, columnspan=2, sticky=(tk.W, tk.E))
+        self.status_label = ttk.Label(frame, text="", wraplength=400)
+        self.status_label.grid(column=0, row=5, columnspan=2, sticky=tk.W)
+
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(column=0, row=6, columnspan=2, sticky=tk.E)
+        self.start_button = ttk.Button(button_frame, text="Start", command=self.start)
+        self.start_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Cancel Campaign", command=self.cancel, state="disabled")
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        for child in frame.winfo_children():
+            child.grid_configure(padx=5, pady=5)
+
+    def add_checkbuttons(self, frame, row, title, values):
+        group = ttk.LabelFrame(frame, text=title, padding="5")
+        group.grid(column=0, row=row, columnspan=2, sticky=(tk.W, tk.E))
+        variables = {}
+        for i, value in enumerate(values):
+            variables[value] = tk.BooleanVar(value=True)
+            ttk.Checkbutton(group, text=value, variable=variables[value],
+                            command=self.update_match_count).grid(column=i % 3, row=i // 3, sticky=tk.W, padx=5)
+        return variables
+
+    def selection(self):
+        device_types = {value for value, var in self.type_vars.items() if var.get()}
+        statuses = {value for value, var in self.status_vars.items() if var.get()}
+        return device_types, statuses
+
+    def update_match_count(self):
+        device_types, statuses = self.selection()
+        with self.monitor.lock:
+            count = sum(1 for node in self.monitor.node_manager.iter_nodes()
+                        if node.device_type in device_types and node.status in statuses)
+        self.match_label.configure(text=f"{count} devices match")
+
+    def start(self):
+        device_types, statuses = self.selection()
+        data = list(COMMANDS)[self.command.current()]
+        name = self.command.get()
+        if not messagebox.askyesno("Group Command", f"Send {name} to the selected devices?", parent=self):
+            return
+        self.campaign = self.monitor.start_campaign(data, device_types, statuses)
+        self.start_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress.configure(maximum=max(1, self.campaign.total), value=0)
+        self.poll_progress()
+
+    def poll_progress(self):
+        done, summary, finished = self.monitor.campaign_scheduler.progress(self.campaign)
+        self.progress.configure(value=done)
+        self.status_label.configure(text=summary)
+        if finished:
+            self.after_id = None
+            self.start_button.configure(state="normal")
+            self.cancel_button.configure(state="disabled")
+        else:
+            self.after_id = self.after(POLL_INTERVAL, self.poll_progress)
+
+    def cancel(self):
+        if self.campaign:
+            self.monitor.campaign_scheduler.cancel(self.campaign)
+
+    def on_close(self):
+        if self.after_id:
+            self.after_cancel(self.after_id)
+        self.destroy()
@@ -1,6 +1,8 @@
 import tkinter as tk
+from itertools import chain
 from tkinter import ttk, messagebox
 from config.settings import save_config
+from core.snapshot import DEFAULT_SNAPSHOT_FILE, load_snapshot
 from networking.chirpstack_client import ChirpStackClient
 
 
@@ -10,7 +12,9 @@ class ConfigDialog(tk.Toplevel):
         self.title("ChirpStack and MQTT Configuration")
         self.config = config
         self.config_complete = False
+        self.client = None  # The ChirpStackClient built on connect, reused by the main window
         self.devices = []
+        self.snapshot = None  # Saved node state for a warm start, if there is one for this application
         self.setup_ui()
 
     def setup_ui(self):
@@ -71,6 +75,7 @@ class ConfigDialog(tk.Toplevel):
 
     def connect(self):
         self.config = {
+            **self.config,  # Keep settings that are not edited here (e.g. log_level)
             'server_address': self.server_address.get(),
             'server_port': self.server_port.get(),
             'api_token': self.api_token.get(),
@@ -85,9 +90,18 @@ class ConfigDialog(tk.Toplevel):
                 f"{self.config['server_address']}:{self.config['server_port']}",
                 self.config['api_token'],
                 self.config['app_id'],
-                self.config['tenant_id']
+                self.config['tenant_id'],
+                compression=self.config.get('grpc_compression') or None
             )
-            self.devices = client.list_devices(self.config['app_id'])
+            self.snapshot = load_snapshot(self.config.get('snapshot_file', DEFAULT_SNAPSHOT_FILE), client.server,
+                                          self.config['app_id'])
+            if self.snapshot is None:
+                # Only the first page is fetched here; the rest of the inventory is
+                # streamed by the main window while it renders the first tiles.
+                devices = client.iter_devices(self.config['app_id'])
+                first_device = next(devices, None)
+                self.devices = chain([first_device], devices) if first_device else []
+            self.client = client
             save_config(self.config)
             self.config_complete = True
             self.destroy()
@@ -0,0 +1,163 @@
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from tkinter import ttk, font as tkfont
+
+HISTORY_QUERY_LIMIT = 1000  # newest rows fetched per history query
+
+
+class EventListView(ttk.Frame):
+    """Virtual list over an EventStore query.
+
+    The Listbox only ever holds the rows that fit on screen; events are formatted
+    as they scroll into view. The query is re-run when the store changes and the
+    view sticks to the newest event unless the user has scrolled up. With
+    background=True (for a HistoryStore on disk) the query runs on a worker
+    thread and poll() picks up the result, so the Tk loop never waits on it.
+    """
+
+    def __init__(self, container, event_store, refresh_interval=500, background=False, **query):
+        super().__init__(container)
+        self.event_store = event_store
+        self.refresh_interval = refresh_interval  # ms
+        self.query = query
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-query") if background else None
+        self.pending = None  # (future, query) of the running background query
+        self.events = []
+        self.top = 0
+        self.follow = True
+        self.version = None
+
+        self.listbox = tk.Listbox(self, activestyle="none")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.line_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+
+        self.listbox.bind("<Configure>", lambda e: self.render())
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_to(self.top - int(3 * (e.delta / 120))))
+        self.after_id = self.after(0, self.poll)
+        self.bind("<Destroy>", self.on_destroy)
+
+    def set_query(self, **query):
+        self.query = query
+        self.version = None
+        self.follow = True
+        self.refresh()
+
+    def poll(self):
+        if self.pending and self.pending[0].done():
+            future, query = self.pending
+            self.pending = None
+            if query is self.query and future.exception() is None:
+                self.events = future.result()
+                self.render()
+            else:
+                self.version = None  # Filters changed meanwhile (or the query failed); run it again
+        if self.event_store.version != self.version:
+            self.refresh()
+        # Check back soon while a background query is running
+        self.after_id = self.after(50 if self.pending else self.refresh_interval, self.poll)
+
+    def refresh(self):
+        if self.executor is None:
+            self.version = self.event_store.version
+            self.events = self.event_store.query(**self.query)
+            self.render()
+        elif self.pending is None:
+            self.version = self.event_store.version
+            self.pending = (self.executor.submit(self.event_store.query, **self.query), self.query)
+
+    def visible_rows(self):
+        return max(1, self.listbox.winfo_height() // self.line_height)
+
+    def render(self):
+        visible = self.visible_rows()
+        max_top = max(0, len(self.events) - visible)
+        self.top = max_top if self.follow else min(self.top, max_top)
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *[event.format() for event in self.events[self.top:self.top + visible]])
+        total = max(1, len(self.events))
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.events)))
+        elif unit == "pages":
+            self.scroll_to(self.top + int(amount) * self.visible_rows())
+        else:
+            self.scroll_to(self.top + int(amount))
+
+    def scroll_to(self, top):
+        max_top = max(0, len(self.events) - self.visible_rows())
+        self.top = max(0, min(top, max_top))
+        self.follow = self.top >= max_top
+        self.render()
+
+    def on_destroy(self, event):
+        if event.widget is self:
+            self.after_cancel(self.after_id)
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class EventWindow(tk.Toplevel):
+    """Filterable event list over an EventStore or a HistoryStore."""
+
+    def __init__(self, parent, title, event_store, alerts_only=False, dev_eui=None, refresh_interval=500,
+                 history=False):
+        super().__init__(parent)
+        self.title(title)
+        self.geometry("700x400")
+        self.event_store = event_store
+        self.alerts_only = alerts_only
+        self.refresh_interval = refresh_interval
+        self.history = history  # event_store is a HistoryStore: query off the Tk thread, newest rows only
+        self.setup_ui(dev_eui)
+
+    def setup_ui(self, dev_eui=None):
+        filters = ttk.Frame(self, padding=(10, 10, 10, 0))
+        filters.pack(fill=tk.X)
+
+        ttk.Label(filters, text="Dev EUI:").pack(side=tk.LEFT)
+        self.dev_eui = ttk.Entry(filters, width=18)
+        self.dev_eui.pack(side=tk.LEFT, padx=(0, 10))
+        if dev_eui:
+            self.dev_eui.insert(0, dev_eui)
+
+        ttk.Label(filters, text="Type:").pack(side=tk.LEFT)
+        self.event_type = ttk.Combobox(filters, width=14, values=[""] + self.event_store.event_types(),
+                                       postcommand=self.update_event_types)
+        self.event_type.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Label(filters, text="Last minutes:").pack(side=tk.LEFT)
+        self.minutes = ttk.Entry(filters, width=6)
+        self.minutes.pack(side=tk.LEFT, padx=(0, 10))
+
+        ttk.Button(filters, text="Apply", command=self.apply_filters).pack(side=tk.LEFT)
+
+        query = self.base_query()
+        if dev_eui:
+            query['dev_eui'] = dev_eui
+        self.view = EventListView(self, self.event_store, self.refresh_interval, background=self.history, **query)
+        self.view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    def update_event_types(self):
+        self.event_type.configure(values=[""] + self.event_store.event_types())
+
+    def base_query(self):
+        query = {'alerts_only': self.alerts_only}
+        if self.history:
+            query['limit'] = HISTORY_QUERY_LIMIT
+        return query
+
+    def apply_filters(self):
+        query = self.base_query()
+        if self.dev_eui.get().strip():
+            query['dev_eui'] = self.dev_eui.get().strip()
+        if self.event_type.get():
+            query['event_type'] = self.event_type.get()
+        minutes = self.minutes.get().strip()
+        if minutes.isdigit():
+            query['start'] = datetime.now() - timedelta(minutes=int(minutes))
+        self.view.set_query(**query)
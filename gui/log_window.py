@@ -1,34 +1,289 @@
+import os
 import tkinter as tk
-from tkinter import ttk
+from bisect import bisect_right
+from tkinter import ttk, font as tkfont
 from utils.logging_utils import logger
 
+INDEX_STEP_BYTES = 8 * 1024 * 1024  # bytes indexed per Tk tick while catching up
+SEARCH_STEP_BYTES = 4 * 1024 * 1024  # bytes searched per Tk tick
+FOLLOW_INTERVAL = 1000  # ms between checks for appended lines
+CATCH_UP_INTERVAL = 10  # ms between index steps while the initial index is built
+
+
+class LogFileIndex:
+    """Sparse line index over an append-only text file.
+
+    The file is split into blocks of roughly block_size bytes that start on a line
+    boundary; only each block's byte offset and first line number are kept, so the
+    index stays small however large the log grows. Lines are read from disk on demand.
+    """
+
+    def __init__(self, path, block_size=64 * 1024):
+        self.path = path
+        self.block_size = block_size
+        self.reset()
+
+    def reset(self):
+        self.block_offsets = [0]
+        self.block_first_lines = [0]
+        self.indexed_size = 0  # always just past a newline
+        self.line_count = 0
+
+    def file_size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def refresh(self, max_bytes=None):
+        """Index newly appended complete lines; returns True once the index is caught up."""
+        size = self.file_size()
+        if size < self.indexed_size:  # File was truncated or replaced
+            self.reset()
+        end = size if max_bytes is None else min(size, self.indexed_size + max_bytes)
+        if end <= self.indexed_size:
+            return end >= size
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.indexed_size)
+            data = f.read(end - self.indexed_size)
+        last_newline = data.rfind(b'\n')
+        if last_newline < 0:
+            return end >= size
+        data = data[:last_newline + 1]
+        base = self.indexed_size
+
+        pos = 0
+        while pos < len(data):
+            boundary = self.block_offsets[-1] + self.block_size - base
+            if boundary >= len(data):
+                self.line_count += data.count(b'\n', pos)
+                break
+            cut = data.find(b'\n', max(boundary, pos)) + 1
+            self.line_count += data.count(b'\n', pos, cut)
+            pos = cut
+            self.block_offsets.append(base + pos)
+            self.block_first_lines.append(self.line_count)
+
+        self.indexed_size = base + len(data)
+        return end >= size
+
+    def offset_of_line(self, line):
+        block = bisect_right(self.block_first_lines, line) - 1
+        offset = self.block_offsets[block]
+        skip = line - self.block_first_lines[block]
+        if skip == 0:
+            return offset
+        block_end = self.block_offsets[block + 1] if block + 1 < len(self.block_offsets) else self.indexed_size
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(block_end - offset)
+        pos = 0
+        for _ in range(skip):
+            pos = data.find(b'\n', pos) + 1
+            if pos == 0:
+                return self.indexed_size
+        return offset + pos
+
+    def line_of_offset(self, offset):
+        block = bisect_right(self.block_offsets, offset) - 1
+        start = self.block_offsets[block]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            data = f.read(offset - start)
+        return self.block_first_lines[block] + data.count(b'\n')
+
+    def get_lines(self, start_line, count):
+        start_line = max(0, min(start_line, self.line_count))
+        count = min(count, self.line_count - start_line)
+        if count <= 0:
+            return []
+        offset = self.offset_of_line(start_line)
+        lines = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            remainder = b''
+            while len(lines) < count and offset < self.indexed_size:
+                chunk = f.read(min(self.block_size, self.indexed_size - offset))
+                offset += len(chunk)
+                parts = (remainder + chunk).split(b'\n')
+                remainder = parts.pop()
+                lines.extend(parts)
+        return [line.decode('utf-8', errors='replace') for line in lines[:count]]
+
+
+def read_tail(path, count, max_bytes=256 * 1024):
+    """Last count complete lines of a file, without indexing it."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_bytes))
+            data = f.read()
+    except OSError:
+        return []
+    lines = data.split(b'\n')[:-1]  # Drop the incomplete last line
+    if size > max_bytes and lines:
+        lines = lines[1:]  # The first line is probably cut off
+    return [line.decode('utf-8', errors='replace') for line in lines[-count:]]
+
+
 class LogWindow(tk.Toplevel):
+    """Log viewer that only ever holds one screenful of lines.
+
+    It opens at the tail, follows appended lines while "Follow" is checked, and
+    searches the file on disk in steps so the UI stays responsive.
+    """
+
     def __init__(self, parent, title, log_type="general"):
         super().__init__(parent)
         self.title(title)
         self.geometry("600x400")
         self.log_type = log_type
+        logger.flush()  # Make sure buffered entries are on disk before reading
+        log_file = logger.alert_log_file if self.log_type == "alert" else logger.general_log_file
+        self.index = LogFileIndex(log_file)
+        self.top_line = 0
+        self.caught_up = False
+        self.search_pos = None
+        self.search_wrapped = False
+        self.after_id = None
+        self.search_after_id = None
         self.setup_ui()
+        self.bind("<Destroy>", self.on_destroy)
+        self.poll()
 
     def setup_ui(self):
+        toolbar = ttk.Frame(self, padding=(10, 10, 10, 0))
+        toolbar.pack(fill=tk.X)
+        self.search_entry = ttk.Entry(toolbar, width=30)
+        self.search_entry.pack(side=tk.LEFT)
+        self.search_entry.bind("<Return>", lambda e: self.find_next())
+        ttk.Button(toolbar, text="Find Next", command=self.find_next).pack(side=tk.LEFT, padx=5)
+        self.follow = tk.BooleanVar(value=True)
+        ttk.Checkbutton(toolbar, text="Follow", variable=self.follow, command=self.render).pack(side=tk.LEFT)
+        self.status_label = ttk.Label(toolbar, text="")
+        self.status_label.pack(side=tk.RIGHT)
+
         frame = ttk.Frame(self, padding="10")
         frame.pack(fill=tk.BOTH, expand=True)
 
-        self.text = tk.Text(frame, wrap=tk.WORD, width=80, height=20)
-        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text = tk.Text(frame, wrap=tk.NONE, width=80, height=20)
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.on_scrollbar)
+        xscrollbar = ttk.Scrollbar(frame, orient="horizontal", command=self.text.xview)
+        self.text.config(xscrollcommand=xscrollbar.set, state=tk.DISABLED)
+        self.text.tag_configure("match", background="yellow")
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        xscrollbar.grid(row=1, column=0, sticky="ew")
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
 
-        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.text.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.text.config(yscrollcommand=scrollbar.set)
+        self.line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        self.text.bind("<MouseWheel>", lambda e: self.scroll_lines(int(-3 * (e.delta / 120))))
+        self.text.bind("<Configure>", lambda e: self.render())
 
-        self.load_log_content()
+    def visible_lines(self):
+        return max(1, self.text.winfo_height() // self.line_height)
 
-    def load_log_content(self):
-        try:
-            log_file = logger.alert_log_file if self.log_type == "alert" else logger.general_log_file
-            with open(log_file, 'r') as file:
-                content = file.read()
-            self.text.insert(tk.END, content)
-        except Exception as e:
-            self.text.insert(tk.END, f"Error loading log file: {str(e)}")
-        self.text.config(state=tk.DISABLED)
\ No newline at end of file
+    def poll(self):
+        self.caught_up = self.index.refresh(INDEX_STEP_BYTES)
+        self.render()
+        self.after_id = self.after(FOLLOW_INTERVAL if self.caught_up else CATCH_UP_INTERVAL, self.poll)
+
+    def render(self):
+        visible = self.visible_lines()
+        if self.follow.get():
+            if not self.caught_up:
+                # Show the tail straight away while the rest of the file is being indexed
+                self.show_lines(read_tail(self.index.path, visible))
+                self.status_label.config(text=f"Indexing... {self.index.line_count} lines")
+                return
+            self.top_line = max(0, self.index.line_count - visible)
+        self.show_lines(self.index.get_lines(self.top_line, visible))
+
+        total = max(1, self.index.line_count)
+        self.scrollbar.set(self.top_line / total, min(1.0, (self.top_line + visible) / total))
+        if self.search_pos is None:
+            status = f"Lines {self.top_line + 1}-{min(total, self.top_line + visible)} of {self.index.line_count}"
+            self.status_label.config(text=status if self.caught_up else f"Indexing... {status}")
+
+    def show_lines(self, lines):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, "\n".join(lines))
+        needle = self.search_entry.get()
+        if needle:
+            start = "1.0"
+            while True:
+                start = self.text.search(needle, start, stopindex=tk.END, nocase=True)
+                if not start:
+                    break
+                end = f"{start}+{len(needle)}c"
+                self.text.tag_add("match", start, end)
+                start = end
+        self.text.config(state=tk.DISABLED)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.index.line_count))
+        elif unit == "pages":
+            self.scroll_lines(int(amount) * self.visible_lines())
+        else:
+            self.scroll_lines(int(amount))
+
+    def scroll_lines(self, delta):
+        self.scroll_to(self.top_line + delta)
+
+    def scroll_to(self, line):
+        max_top = max(0, self.index.line_count - self.visible_lines())
+        self.top_line = max(0, min(line, max_top))
+        self.follow.set(self.top_line >= max_top and self.caught_up)
+        self.render()
+
+    def find_next(self):
+        needle = self.search_entry.get()
+        if not needle:
+            return
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+        self.search_needle = needle.encode('utf-8').lower()
+        # Continue from the line after the current top so repeated searches advance
+        self.search_start = self.index.offset_of_line(min(self.top_line + 1, self.index.line_count))
+        self.search_pos = self.search_start
+        self.search_wrapped = False
+        self.status_label.config(text="Searching...")
+        self.search_step()
+
+    def search_step(self):
+        self.search_after_id = None
+        limit = self.search_start if self.search_wrapped else self.index.indexed_size
+        end = min(limit, self.search_pos + SEARCH_STEP_BYTES)
+        overlap = len(self.search_needle) - 1
+        with open(self.index.path, 'rb') as f:
+            f.seek(self.search_pos)
+            data = f.read(min(self.index.indexed_size, end + overlap) - self.search_pos).lower()
+        found = data.find(self.search_needle)
+        if found >= 0:
+            line = self.index.line_of_offset(self.search_pos + found)
+            self.search_pos = None
+            self.follow.set(False)
+            self.scroll_to(line)
+            return
+        self.search_pos = end
+        if end >= limit:
+            if self.search_wrapped or self.search_start == 0:
+                self.search_pos = None
+                self.status_label.config(text="Not found")
+                return
+            self.search_wrapped = True
+            self.search_pos = 0
+        self.search_after_id = self.after(1, self.search_step)
+
+    def on_destroy(self, event):
+        if event.widget is not self:
+            return
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
@@ -1,36 +1,71 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from .node_block import NodeBlock
 from .node_detail_dialog import NodeDetailDialog
-from .scrollable_frame import ScrollableFrame
+from .scrollable_frame import ScrollableFrame, VirtualNodeGrid
+from .event_list_view import EventWindow
 from .log_window import LogWindow
 from .add_node_dialog import AddNodeDialog
-from core.node_manager import NodeManager
-from networking.mqtt_client import MQTTClient
+from .bulk_import_dialog import BulkImportDialog
+from .campaign_dialog import CampaignDialog
+from .blink_clock import BlinkClock
+from .render_scheduler import RenderScheduler
+from networking.async_chirpstack_client import AsyncChirpStackClient
 from utils.logging_utils import logger
-import json
-from datetime import datetime, timedelta
 
 VERSION = "1.2"
+DELTA_POLL_INTERVAL = 100  # ms between checks for node changes made by the monitor
+NODE_BLOCK_WIDTH = 200  # px per grid column
+NODE_BLOCK_HEIGHT = 90  # px per row in the virtual grid
+RESIZE_DEBOUNCE = 150  # ms
+HISTORY_REFRESH_INTERVAL = 2000  # ms between history view refreshes
+LOAD_POLL_INTERVAL = 50  # ms between checks for node batches from the loader thread
 
 
 class MainWindow:
-    def __init__(self, master, chirpstack_client, devices, mqtt_config):
+    """Tk front end for a Monitor.
+
+    The monitor handles MQTT events and alerts on its own thread; the window
+    only polls it for changed nodes and redraws their tiles.
+    """
+
+    def __init__(self, master, monitor, devices, snapshot=None, virtual_grid=False):
         self.master = master
-        self.chirpstack_client = chirpstack_client
-        self.node_manager = NodeManager()
+        self.monitor = monitor
+        self.virtual_grid = virtual_grid
+        self.chirpstack_client = monitor.chirpstack_client
+        # All GUI-initiated ChirpStack calls go through the worker pool so the Tk loop never blocks
+        self.async_client = AsyncChirpStackClient(self.chirpstack_client, master)
+        self.node_manager = monitor.node_manager
+        self.event_store = monitor.event_store
+        self.history_store = monitor.history_store
+        self.link_history = monitor.link_history
+        # Tile repaints are batched into one pass per frame instead of one per uplink
+        self.render_scheduler = RenderScheduler(master, frame_interval=100)
+        self.blink_clock = BlinkClock(master)
         self.setup_styles()
         self.setup_ui()
-        self.node_manager.load_nodes_from_chirpstack(devices)
+        # Node batches, then None or the error, from the loader or reconcile thread
+        self.load_queue = queue.SimpleQueue()
+        self.load_poll_id = None
+        self.loaded_count = 0
+        self.warm_start = snapshot is not None
+        if snapshot is not None:
+            # Warm start: draw the saved state now, apply ChirpStack's differences when they arrive
+            self.monitor.load_snapshot(snapshot)
         self.update_node_layout()  # Update the layout after loading nodes
-
-        self.mqtt_client = MQTTClient(
-            mqtt_config['broker'],
-            mqtt_config['port'],
-            self.handle_mqtt_message
-        )
-        self.mqtt_client.connect()
-        self.node_manager.load_nodes_from_chirpstack(devices)
+        self.delta_version = self.monitor.version
+        self.monitor.start()
+        if snapshot is not None:
+            # The first ChirpStack call; a wrong server or token is reported when it fails
+            self.monitor.reconcile_in_background(on_complete=self.load_queue.put)
+        else:
+            # The remaining pages are fetched off the Tk thread and drawn batch by batch
+            threading.Thread(target=self.load_inventory, args=(devices,), name="inventory", daemon=True).start()
+        self.load_poll_id = self.master.after(LOAD_POLL_INTERVAL, self.poll_loaded_nodes)
+        self.delta_poll_id = self.master.after(DELTA_POLL_INTERVAL, self.poll_deltas)
 
     def setup_ui(self):
         self.master.title("LoRa Node Management")
@@ -51,21 +86,42 @@ class MainWindow:
         node_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Node", menu=node_menu)
         node_menu.add_command(label="Add New Node", command=self.add_new_node)
+        node_menu.add_command(label="Import Nodes...", command=self.import_nodes)
+        node_menu.add_command(label="Group Command...", command=self.open_group_command)
         node_menu.add_command(label="Remove Node", command=self.remove_node_menu)
 
         logs_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Logs", menu=logs_menu)
         logs_menu.add_command(label="General Log", command=self.show_general_log)
         logs_menu.add_command(label="Alert Log", command=self.show_alert_log)
+        logs_menu.add_separator()
+        logs_menu.add_command(label="Recent Events", command=self.show_recent_events)
+        logs_menu.add_command(label="Recent Alerts", command=self.show_recent_alerts)
+        if self.history_store:
+            logs_menu.add_command(label="Event History", command=self.show_event_history)
 
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=self.show_about)
 
     def setup_node_frame(self):
+        if self.virtual_grid:
+            # Only the tiles in view exist as widgets; for very large fleets
+            self.scrollable_frame = VirtualNodeGrid(self.master, self.create_node_block, self.render_scheduler,
+                                                    NODE_BLOCK_WIDTH, NODE_BLOCK_HEIGHT)
+            self.scrollable_frame.pack(fill=tk.BOTH, expand=True)
+            self.resize_after_id = None
+            self.update_node_layout()
+            return
+
         self.scrollable_frame = ScrollableFrame(self.master)
         self.scrollable_frame.pack(fill=tk.BOTH, expand=True)
         self.node_frame = self.scrollable_frame.scrollable_frame
+        self.node_blocks = {}  # dev_eui -> NodeBlock
+        self.layout_order = []  # dev_euis in the order they are currently gridded
+        self.layout_columns = 0
+        self.resize_after_id = None
+        self.scrollable_frame.canvas.bind("<Configure>", self.on_node_frame_resize, add="+")
         self.update_node_layout()
 
     def setup_styles(self):
@@ -75,43 +131,123 @@ class MainWindow:
         style.configure("Red.TFrame", background="red")
 
     def update_node_layout(self):
-        logger.log("Starting update_node_layout")
-        logger.log(f"Number of nodes: {len(self.node_manager.get_all_nodes())}")
-
-        for widget in self.node_frame.winfo_children():
-            widget.destroy()
-
-        nodes = self.node_manager.get_all_nodes()
-        width = self.node_frame.winfo_width()
-        node_width = 200  # Adjust as needed
-        columns = max(1, width // node_width)
-
-        for i, node in enumerate(nodes):
-            row = i // columns
-            col = i % columns
-            node_block = NodeBlock(self.node_frame, node, self.on_node_click)
-            node_block.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            node_block.bind('<<NodeClicked>>', self.on_node_click)
-            node_block.bind('<<NodeRightClicked>>', self.on_node_right_click)
-            logger.log(f"Created block for node: {node.name} (Status: {node.status})")
-
-        for i in range(columns):
-            self.node_frame.columnconfigure(i, weight=1)
-        self.node_frame.rowconfigure("all", weight=1)
-
-        logger.log(f"Finished update_node_layout. Displayed {len(nodes)} nodes.")
-
-        # Force redraw
-        self.master.update_idletasks()
-        current_geometry = self.master.geometry()
-        self.master.geometry(f"{self.master.winfo_width() + 1}x{self.master.winfo_height()}")
-        self.master.geometry(current_geometry)
-        logger.log("Finished update_node_layout")
+        """Reconcile the tiles with NodeManager, keyed by dev_eui.
+
+        Existing tiles are reused; only tiles for added or removed nodes are
+        created or destroyed, and only tiles whose grid position changed are moved.
+        """
+        logger.debug("Starting update_node_layout")
+        with self.monitor.lock:
+            nodes = dict(self.node_manager.nodes)
+        logger.debug("Number of nodes: %d", len(nodes))
+        if self.virtual_grid:
+            self.scrollable_frame.set_nodes(nodes.values())
+            return
+
+        for dev_eui in [dev_eui for dev_eui in self.node_blocks if dev_eui not in nodes]:
+            node_block = self.node_blocks.pop(dev_eui)
+            self.render_scheduler.discard(node_block)
+            node_block.destroy()
+
+        for dev_eui, node in nodes.items():
+            node_block = self.node_blocks.get(dev_eui)
+            if node_block is None:
+                self.node_blocks[dev_eui] = self.create_node_block(node)
+            elif node_block.node is not node:  # Node was reloaded from ChirpStack
+                node_block.node = node
+                self.render_scheduler.mark_dirty(node_block)
+
+        self.layout_node_blocks(list(nodes))
+        logger.debug("Finished update_node_layout. Displayed %d nodes.", len(nodes))
+
+    def create_node_block(self, node, master=None):
+        node_block = NodeBlock(master or self.node_frame, node, self.on_node_click, self.blink_clock)
+        node_block.bind('<<NodeClicked>>', self.on_node_click)
+        node_block.bind('<<NodeRightClicked>>', self.on_node_right_click)
+        logger.debug("Created block for node: %s (Status: %s)", node.name, node.status)
+        return node_block
+
+    def get_grid_columns(self):
+        width = self.scrollable_frame.canvas.winfo_width()
+        return max(1, width // NODE_BLOCK_WIDTH)
+
+    def layout_node_blocks(self, order):
+        columns = self.get_grid_columns()
+        start = 0
+        if columns == self.layout_columns:
+            # Tiles before the first difference keep their grid cell
+            common = min(len(order), len(self.layout_order))
+            if order[:common] == self.layout_order[:common]:
+                start = common
+            else:
+                start = next(i for i in range(common) if order[i] != self.layout_order[i])
+
+        for i in range(start, len(order)):
+            self.node_blocks[order[i]].grid(row=i // columns, column=i % columns, padx=5, pady=5, sticky="nsew")
+
+        if columns != self.layout_columns:
+            for i in range(max(columns, self.layout_columns)):
+                self.node_frame.columnconfigure(i, weight=1 if i < columns else 0)
+        self.layout_order = order
+        self.layout_columns = columns
+
+    def on_node_frame_resize(self, event):
+        # Debounced: reflow once the user has finished resizing
+        if self.resize_after_id is not None:
+            self.master.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.master.after(RESIZE_DEBOUNCE, self.reflow_node_blocks)
+
+    def reflow_node_blocks(self):
+        self.resize_after_id = None
+        if self.get_grid_columns() != self.layout_columns:
+            self.layout_node_blocks(self.layout_order)
+
+    def load_inventory(self, devices):
+        # Loader thread; the Tk loop picks the results up in poll_loaded_nodes()
+        try:
+            self.monitor.stream_nodes(devices, on_batch=self.load_queue.put)
+            self.load_queue.put(None)
+        except Exception as e:
+            self.load_queue.put(e)
+
+    def poll_loaded_nodes(self):
+        while True:
+            try:
+                item = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, list):
+                self.on_nodes_loaded(item)
+                continue
+            # Finished; the layout change it made reaches poll_deltas() for the final reconcile
+            self.load_poll_id = None
+            if item is not None and self.warm_start:
+                messagebox.showerror("Connection Error", f"Could not check the saved nodes with ChirpStack: "
+                                                         f"{str(item)}\nShowing the last saved state.")
+            elif item is not None:
+                logger.log(f"Error loading nodes from ChirpStack: {str(item)}")
+                messagebox.showerror("Loading Error",
+                                     f"Only {self.loaded_count} nodes were loaded from ChirpStack: {str(item)}")
+            return
+        self.load_poll_id = self.master.after(LOAD_POLL_INTERVAL, self.poll_loaded_nodes)
+
+    def on_nodes_loaded(self, nodes):
+        # Render each page of the inventory as soon as it arrives, adding only that page's tiles;
+        # the full update_node_layout() runs once the whole inventory is in
+        logger.debug("Loaded batch of %d nodes", len(nodes))
+        self.loaded_count += len(nodes)
+        if self.virtual_grid:
+            self.scrollable_frame.add_nodes(nodes)
+        else:
+            new_nodes = [node for node in nodes if node.dev_eui not in self.node_blocks]
+            for node in new_nodes:
+                self.node_blocks[node.dev_eui] = self.create_node_block(node)
+            self.layout_node_blocks(self.layout_order + [node.dev_eui for node in new_nodes])
 
     def on_node_click(self, event):
         node = event.widget.node
         if node.has_alert:
-            node.clear_alert()
+            self.monitor.clear_alert(node)
             self.update_node_block(node)
         self.open_node_detail(node)
 
@@ -126,7 +262,8 @@ class MainWindow:
         context_menu.grab_release()
 
     def remove_node_menu(self):
-        nodes = self.node_manager.get_all_nodes()
+        with self.monitor.lock:
+            nodes = self.node_manager.get_all_nodes()
         if not nodes:
             messagebox.showinfo("No Nodes", "There are no nodes to remove.")
             return
@@ -147,23 +284,30 @@ class MainWindow:
             pady=5)
 
     def remove_selected_node(self, node_name, dialog):
-        node = next((node for node in self.node_manager.get_all_nodes() if node.name == node_name), None)
+        with self.monitor.lock:
+            node = next((node for node in self.node_manager.iter_nodes() if node.name == node_name), None)
         if node:
             self.remove_node(node)
         dialog.destroy()
 
     def remove_node(self, node):
         if messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove the node {node.name}?"):
-            try:
-                self.chirpstack_client.remove_device(node.dev_eui)
-                self.node_manager.remove_node(node.dev_eui)
-                logger.log(f"Node {node.name} ({node.dev_eui}) removed successfully")
-                messagebox.showinfo("Success", f"Node {node.name} removed successfully.")
-                self.update_node_layout()
-            except Exception as e:
-                error_message = f"Failed to remove node {node.name}: {str(e)}"
-                logger.log(error_message)
-                messagebox.showerror("Error", error_message)
+            self.async_client.remove_device(
+                node.dev_eui,
+                callback=lambda _: self.on_node_removed(node),
+                error_callback=lambda e: self.on_remove_error(node, e)
+            )
+
+    def on_node_removed(self, node):
+        self.monitor.remove_node(node.dev_eui)
+        logger.log(f"Node {node.name} ({node.dev_eui}) removed successfully")
+        self.update_node_layout()
+        messagebox.showinfo("Success", f"Node {node.name} removed successfully.")
+
+    def on_remove_error(self, node, error):
+        error_message = f"Failed to remove node {node.name}: {str(error)}"
+        logger.log(error_message)
+        messagebox.showerror("Error", error_message)
 
     def show_general_log(self):
         LogWindow(self.master, "General Log", "general")
@@ -171,41 +315,55 @@ class MainWindow:
     def show_alert_log(self):
         LogWindow(self.master, "Alert Log", "alert")
 
+    def show_recent_events(self):
+        EventWindow(self.master, "Recent Events", self.event_store)
+
+    def show_recent_alerts(self):
+        EventWindow(self.master, "Recent Alerts", self.event_store, alerts_only=True)
+
+    def show_event_history(self):
+        EventWindow(self.master, "Event History", self.history_store, refresh_interval=HISTORY_REFRESH_INTERVAL,
+                    history=True)
+
     def open_node_detail(self, node):
-        logger.log(f"Opening detail dialog for node: {node.name}")
-        NodeDetailDialog(self.master, node, self.chirpstack_client)
+        logger.debug("Opening detail dialog for node: %s", node.name)
+        NodeDetailDialog(self.master, node, self.async_client, self.link_history, self.history_store)
 
     def add_new_node(self):
-        dialog = AddNodeDialog(self.master, self.chirpstack_client, self.node_manager)
+        # The monitor's add_node keeps its offline deadlines and change tracking in step
+        dialog = AddNodeDialog(self.master, self.async_client, self.monitor)
         self.master.wait_window(dialog)
 
-        logger.log(f"Dialog closed. Checking if node was added.")
+        logger.debug("Dialog closed. Checking if node was added.")
 
         if hasattr(dialog, 'node_added') and dialog.node_added:
             logger.log(f"New node added: {dialog.added_node.name}")
-            logger.log(f"Number of nodes before update: {len(self.node_manager.get_all_nodes())}")
+            logger.debug("Number of nodes before update: %d", len(self.node_manager.nodes))
             self.update_node_layout()
-            logger.log(f"Number of nodes after update: {len(self.node_manager.get_all_nodes())}")
-            logger.log("Node layout updated with new node")
+            logger.debug("Number of nodes after update: %d", len(self.node_manager.nodes))
+            logger.debug("Node layout updated with new node")
         else:
-            logger.log("No new node was added.")
+            logger.debug("No new node was added.")
+
+    def import_nodes(self):
+        # Imported nodes reach the grid through poll_deltas once the import finishes
+        BulkImportDialog(self.master, self.async_client, self.monitor)
+
+    def open_group_command(self):
+        CampaignDialog(self.master, self.monitor)
 
     def refresh_nodes(self):
+        self.async_client.list_devices(
+            self.chirpstack_client.app_id,
+            callback=self.on_devices_refreshed,
+            error_callback=lambda e: logger.log(f"Error refreshing nodes: {str(e)}")
+        )
+
+    def on_devices_refreshed(self, devices):
         try:
-            devices = self.chirpstack_client.list_devices(self.chirpstack_client.app_id)
-            self.node_manager.load_nodes_from_chirpstack(devices)
+            self.monitor.load_nodes(devices)
             self.update_node_layout()
             logger.log("Node layout refreshed")
-
-            # Check for offline nodes
-            current_time = datetime.now()
-            for node in self.node_manager.get_all_nodes():
-                if node.last_seen and isinstance(node.last_seen, datetime):
-                    if (current_time - node.last_seen) > timedelta(minutes=10):
-                        node.set_offline()
-                        self.update_node_block(node)
-                else:
-                    logger.log(f"Node {node.name} has invalid last_seen value: {node.last_seen}")
         except Exception as e:
             logger.log(f"Error refreshing nodes: {str(e)}")
 
@@ -213,175 +371,35 @@ class MainWindow:
         message = f"LoRa Node Management\nVersion {VERSION}\n© Avi Bents 2024"
         messagebox.showinfo("About", message)
 
-    def handle_mqtt_message(self, topic: str, payload: dict):
-        logger.log(f"Received MQTT message on topic: {topic}")
-        event_type = topic.split('/')[-1]
-
-        if event_type == "up":
-            self.handle_uplink(payload)
-        elif event_type == "join":
-            self.handle_join(payload)
-        elif event_type == "status":
-            self.handle_status(payload)
-        elif event_type == "ack":
-            self.handle_ack(payload)
-        elif event_type == "txack":
-            self.handle_txack(payload)
-        elif event_type == "log":
-            self.handle_log(payload)
-        else:
-            logger.log(f"Unknown event type: {event_type}")
-
-    def handle_uplink(self, data):
-        device_name = data['deviceInfo'].get('deviceName', 'Unknown device')
-        dev_eui = data['deviceInfo'].get('devEui', 'Unknown DevEUI')
-        message = data.get('object', {}).get('message', 'No message')
-        rssi = data['rxInfo'][0]['rssi'] if 'rxInfo' in data and len(data['rxInfo']) > 0 else 'N/A'
-        snr = data['rxInfo'][0]['snr'] if 'rxInfo' in data and len(data['rxInfo']) > 0 else 'N/A'
-
-        node = self.node_manager.get_node(dev_eui)
-        if node:
-            logger.log(f"Handling uplink for node: {node.name}")
-            node.update_last_seen()
-            if "Alert" in message:
-                node.set_alert()
-                self.handle_alert(node, message)
-            elif not node.has_alert:  # Only update status if there's no active alert
-                node.update_status("Online", datetime.now(), rssi, snr)
-                self.handle_normal_uplink(node, message)
-
-            self.update_node_block(node)
-            logger.log(f"Node block updated for {node.name}")
-        else:
-            logger.log(f"Node not found for DevEUI: {dev_eui}")
-
-        self.update_rssi_snr(rssi, snr)
-
-        timestamp = self.get_time()
-        event_info = f"{timestamp} - Uplink - Device: {device_name}, RSSI: {rssi}, SNR: {snr}, Message: {message}"
-        self.add_event_to_listbox(event_info)
-
-    def handle_alert(self, node, message):
-        alert_info = f"Alert triggered by device {node.name} - {message}"
-        self.add_alert_to_listbox(alert_info)
-
-        # Send 0xFF to Sound Unit and Wearable Alert Unit devices
-        for alert_node in self.node_manager.get_all_nodes():
-            if alert_node.device_type in ["Sound Unit", "Wearable Alert Unit", "LiDAR unit"]:
-                self.chirpstack_client.enqueue_downlink(alert_node.dev_eui, bytes([0xFF]))
-                timestamp = self.get_time()
-                event_info = f"{timestamp} - Downlink sent to device {alert_node.name} - {alert_node.dev_eui}, [0xFF] - Alert Response"
-                self.add_event_to_listbox(event_info)
-
-    def handle_normal_uplink(self, node, message):
-        uplink_info = f"Uplink received from device {node.name} - {message}"
-        self.add_event_to_listbox(uplink_info)
-
-    def handle_status_message(self, device_name, message):
-        status_info = f"Status message from device {device_name} - {message}"
-        self.add_alert_to_listbox(status_info)
-
-    def handle_data_message(self, device_name, message):
-        data_info = f"Data message from device {device_name} - {message}"
-        self.add_alert_to_listbox(data_info)
-
-    def handle_reset_message(self, device_name, message):
-        reset_info = f"Reset message from device {device_name} - {message}"
-        self.add_alert_to_listbox(reset_info)
-
-    def handle_join(self, data):
-        device_name = data['deviceInfo'].get('deviceName', 'Unknown device')
-        dev_eui = data['deviceInfo'].get('devEui', 'Unknown DevEUI')
-
-        timestamp = self.get_time()
-        event_info = f"{timestamp} - Join - Device: {device_name}, DevEUI: {dev_eui}"
-        self.add_event_to_listbox(event_info)
-
-    def handle_status(self, data):
-        device_name = data['deviceInfo'].get('deviceName', 'Unknown device')
-        margin = data.get('margin', 'N/A')
-        battery = data.get('batteryLevel', 'N/A')
-        external_power = data.get('externalPowerSource', False)
-        last_seen = data.get('lastSeenAt', 'N/A')
-
-        timestamp = self.get_time()
-        event_info = f"{timestamp} - Status - Device: {device_name}, Margin: {margin}, Battery: {battery}, External Power: {external_power}, Last Seen: {last_seen}"
-        self.add_event_to_listbox(event_info)
-
-    def handle_ack(self, data):
-        device_name = data['deviceInfo'].get('deviceName', 'Unknown device')
-        acknowledged = data.get('acknowledged', False)
-
-        timestamp = self.get_time()
-        event_info = f"{timestamp} - ACK - Device: {device_name}, Acknowledged: {acknowledged}"
-        self.add_event_to_listbox(event_info)
-
-    def handle_txack(self, data):
-        device_name = data['deviceInfo'].get('deviceName', 'Unknown device')
-
-        timestamp = self.get_time()
-        event_info = f"{timestamp} - TXACK - Device: {device_name}"
-        self.add_event_to_listbox(event_info)
-
-    def handle_log(self, data):
-        device_name = data['deviceInfo'].get('deviceName', 'Unknown device')
-        log_message = data.get('message', 'No message')
-        level = data.get('level', 'Unknown level')
-
-        timestamp = self.get_time()
-        event_info = f"{timestamp} - Log - Device: {device_name}, Level: {level}, Message: {log_message}"
-        self.add_event_to_listbox(event_info)
-
-    def get_time(self):
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    def update_rssi_snr(self, rssi, snr):
-        # Update RSSI and SNR labels in the UI
-        if hasattr(self, 'rssi_label'):
-            self.rssi_label.config(text=f"RSSI: {rssi}")
-        if hasattr(self, 'snr_label'):
-            self.snr_label.config(text=f"SNR: {snr}")
-
-    def add_event_to_listbox(self, event_info):
-        self.master.after(0, lambda: self._add_event_to_listbox(event_info))
-
-    def _add_event_to_listbox(self, event_info):
-        if hasattr(self, 'log_listbox'):
-            self.log_listbox.insert(tk.END, event_info)
-            self.log_listbox.see(tk.END)
-        logger.log(event_info)
-
-    def add_alert_to_listbox(self, alert_info):
-        self.master.after(0, lambda: self._add_alert_to_listbox(alert_info))
-
-    def _add_alert_to_listbox(self, alert_info):
-        if hasattr(self, 'alert_listbox'):
-            self.alert_listbox.insert(tk.END, alert_info)
-            self.alert_listbox.see(tk.END)
-        logger.log(alert_info, is_alert=True)
+    def poll_deltas(self):
+        version, layout_changed, changed = self.monitor.deltas_since(self.delta_version)
+        self.delta_version = version
+        if layout_changed:
+            self.update_node_layout()
+        for dev_eui in changed:
+            node = self.node_manager.get_node(dev_eui)
+            if node:
+                self.update_node_block(node)
+        self.delta_poll_id = self.master.after(DELTA_POLL_INTERVAL, self.poll_deltas)
 
     def update_node_block(self, node):
-        for widget in self.node_frame.winfo_children():
-            if isinstance(widget, NodeBlock) and widget.node.dev_eui == node.dev_eui:
-                logger.log(f"Updating node block for {node.name}. Current status: {node.status}")
-                widget.node = node  # Update the node reference
-                widget.update_display()
-                logger.log(f"Node block updated for {node.name}")
-                break
+        if self.virtual_grid:
+            self.scrollable_frame.refresh_node(node)
+            return
+        node_block = self.node_blocks.get(node.dev_eui)
+        if node_block is not None:
+            logger.debug("Updating node block for %s. Current status: %s", node.name, node.status)
+            node_block.node = node  # Update the node reference
+            self.render_scheduler.mark_dirty(node_block)
         else:
-            logger.log(f"Node block not found for {node.name}")
+            logger.debug("Node block not found for %s", node.name)
 
     def on_closing(self):
-        self.mqtt_client.disconnect()
-        logger.log("MQTT client disconnected")
-
-    def check_offline_nodes(self):
-        try:
-            for node in self.node_manager.get_all_nodes():
-                if not node.is_online():
-                    node.set_offline()
-                    self.update_node_block(node)
-        except Exception as e:
-            logger.log(f"Error checking offline nodes: {str(e)}")
-        finally:
-            self.master.after(60000, self.check_offline_nodes)  # Check every minute
\ No newline at end of file
+        self.master.after_cancel(self.delta_poll_id)
+        if self.load_poll_id is not None:
+            self.master.after_cancel(self.load_poll_id)
+        self.render_scheduler.cancel()
+        self.blink_clock.cancel()
+        if self.resize_after_id is not None:
+            self.master.after_cancel(self.resize_after_id)
+        self.async_client.shutdown()
@@ -4,12 +4,12 @@ from utils.logging_utils import logger
 
 
 class NodeBlock(ttk.Frame):
-    def __init__(self, master, node, on_click):
+    def __init__(self, master, node, on_click, blink_clock):
         super().__init__(master, borderwidth=2, relief="raised", padding=5)
         self.node = node
         self.on_click = on_click
+        self.blink_clock = blink_clock
         self.setup_ui()
-        self.blinking = False
 
     def setup_ui(self):
         self.name_label = ttk.Label(self, text=self.node.name, font=("TkDefaultFont", 12, "bold"))
@@ -30,36 +30,36 @@ class NodeBlock(ttk.Frame):
 
         self.update_display()
 
+    def set_node(self, node):
+        # Re-bind a recycled tile (virtual grid) to another node
+        self.node = node
+        self.name_label.config(text=node.name)
+        self.type_label.config(text=f"Type: {node.device_type}")
+        self.update_display()
+
     def update_display(self):
-        logger.log(f"Updating display for node: {self.node.name}, Status: {self.node.status}")
+        logger.debug("Updating display for node: %s, Status: %s", self.node.name, self.node.status)
         self.status_label.config(text=f"Status: {self.node.status}")
 
         if self.node.has_alert:
-            logger.log(f"Node {self.node.name} has alert, setting Red style")
-            self.configure(style="Red.TFrame")
-            if not self.blinking:
-                self.blinking = True
-                self.blink()
+            logger.debug("Node %s has alert, blinking", self.node.name)
+            # Join the shared clock in its current phase so all alert tiles blink together
+            self.configure(style=self.blink_clock.current_style)
+            self.blink_clock.add(self)
         elif self.node.status == "Online":
-            logger.log(f"Node {self.node.name} is online, setting Green style")
+            logger.debug("Node %s is online, setting Green style", self.node.name)
+            self.blink_clock.discard(self)
             self.configure(style="Green.TFrame")
-            self.blinking = False
         else:
-            logger.log(f"Node {self.node.name} is offline, setting Gray style")
+            logger.debug("Node %s is offline, setting Gray style", self.node.name)
+            self.blink_clock.discard(self)
             self.configure(style="Gray.TFrame")
-            self.blinking = False
 
-        self.master.update_idletasks()
-        logger.log(f"Display updated for node: {self.node.name}")
+        logger.debug("Display updated for node: %s", self.node.name)
 
-    def blink(self):
-        if self.node.has_alert and self.blinking:
-            current_style = self.cget("style")
-            new_style = "Red.TFrame" if current_style != "Red.TFrame" else "Gray.TFrame"
-            self.configure(style=new_style)
-            self.after(500, self.blink)
-        else:
-            self.update_display()
+    def destroy(self):
+        self.blink_clock.discard(self)
+        super().destroy()
 
     def handle_left_click(self, event):
         self.event_generate('<<NodeClicked>>', when="tail")
@@ -1,15 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import numpy as np
+from .event_list_view import EventWindow
 from utils.logging_utils import logger
 
+SPARKLINE_WIDTH = 360
+SPARKLINE_HEIGHT = 60
+
 
 class NodeDetailDialog(tk.Toplevel):
-    def __init__(self, parent, node, chirpstack_client):
+    def __init__(self, parent, node, chirpstack_client, link_history=None, history_store=None):
         super().__init__(parent)
         self.node = node
         self.chirpstack_client = chirpstack_client
+        self.link_history = link_history
+        self.history_store = history_store
         self.title(f"Node Details: {node.name}")
-        self.geometry("400x300")
+        self.geometry("400x520" if link_history else "400x340")
         self.setup_ui()
 
     def setup_ui(self):
@@ -22,12 +29,74 @@ class NodeDetailDialog(tk.Toplevel):
         ttk.Label(frame, text=f"Dev EUI: {self.node.dev_eui}").grid(row=1, column=0, sticky=tk.W)
         ttk.Label(frame, text=f"Type: {self.node.device_type}").grid(row=2, column=0, sticky=tk.W)
         ttk.Label(frame, text=f"Status: {self.node.status}").grid(row=3, column=0, sticky=tk.W)
-        ttk.Label(frame, text=f"SNR: {self.node.snr} dB").grid(row=4, column=0, sticky=tk.W)
-        ttk.Label(frame, text=f"RSSI: {self.node.rssi} dBm").grid(row=5, column=0, sticky=tk.W)
+        ttk.Label(frame, text=f"SNR: {'N/A' if self.node.snr is None else self.node.snr} dB").grid(row=4, column=0, sticky=tk.W)
+        ttk.Label(frame, text=f"RSSI: {'N/A' if self.node.rssi is None else self.node.rssi} dBm").grid(row=5, column=0, sticky=tk.W)
 
         ttk.Button(frame, text="Status Request", command=self.send_status_request).grid(row=6, column=0, pady=5)
         ttk.Button(frame, text="Reset Request", command=self.send_reset_request).grid(row=7, column=0, pady=5)
         ttk.Button(frame, text="Data Collection", command=self.send_data_collection).grid(row=8, column=0, pady=5)
+        if self.history_store:
+            ttk.Button(frame, text="History", command=self.show_history).grid(row=10, column=0, pady=5)
+
+        if self.link_history:
+            self.setup_link_quality(frame)
+
+    def setup_link_quality(self, frame):
+        link_frame = ttk.LabelFrame(frame, text="Link quality", padding="5")
+        link_frame.grid(row=9, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+
+        timestamps, rssi, snr, gateways = self.link_history.history(self.node.dev_eui)
+        if not len(timestamps):
+            ttk.Label(link_frame, text="No uplinks recorded yet").grid(row=0, column=0, sticky=tk.W)
+            return
+
+        stats = self.link_history.node_stats(self.node.dev_eui)
+        if stats is None:  # Removed since the history was read
+            ttk.Label(link_frame, text="No uplinks recorded yet").grid(row=0, column=0, sticky=tk.W)
+            return
+        ttk.Label(link_frame, text=f"Uplinks: {stats['count']} (last via {gateways[-1] or 'unknown gateway'})").grid(
+            row=0, column=0, sticky=tk.W)
+        ttk.Label(link_frame, text=(f"RSSI: mean {stats['rssi_mean']:.1f}, min {stats['rssi_min']:.0f}, "
+                                    f"p10 {stats['rssi_p10']:.1f} dBm{self.format_trend(rssi)}")).grid(
+            row=1, column=0, sticky=tk.W)
+        ttk.Label(link_frame, text=(f"SNR: mean {stats['snr_mean']:.1f}, min {stats['snr_min']:.1f}, "
+                                    f"p10 {stats['snr_p10']:.1f} dB{self.format_trend(snr)}")).grid(
+            row=2, column=0, sticky=tk.W)
+        # Means only; the fleet percentiles are the expensive part and aren't needed here
+        fleet_rssi = self.link_history.fleet_stats(percentiles=())['rssi_mean']
+        ttk.Label(link_frame, text=f"Fleet median RSSI: {np.nanmedian(fleet_rssi):.1f} dBm").grid(
+            row=3, column=0, sticky=tk.W)
+
+        canvas = tk.Canvas(link_frame, width=SPARKLINE_WIDTH, height=SPARKLINE_HEIGHT, background="white",
+                           highlightthickness=0)
+        canvas.grid(row=4, column=0, pady=(5, 0))
+        self.draw_sparkline(canvas, rssi, "blue")
+        self.draw_sparkline(canvas, snr, "orange")
+        ttk.Label(link_frame, text="RSSI (blue) and SNR (orange), oldest to newest").grid(row=5, column=0, sticky=tk.W)
+
+    @staticmethod
+    def format_trend(values):
+        # Change between the older and newer half of the history
+        values = values[~np.isnan(values)]
+        if len(values) < 4:
+            return ""
+        half = len(values) // 2
+        return f" (trend {values[half:].mean() - values[:half].mean():+.1f})"
+
+    @staticmethod
+    def draw_sparkline(canvas, values, color):
+        x = np.linspace(2, SPARKLINE_WIDTH - 2, len(values)) if len(values) > 1 else np.array([SPARKLINE_WIDTH / 2])
+        known = ~np.isnan(values)
+        if known.sum() < 2:
+            return
+        low, high = values[known].min(), values[known].max()
+        span = (high - low) or 1.0
+        y = SPARKLINE_HEIGHT - 4 - (values[known] - low) / span * (SPARKLINE_HEIGHT - 8)
+        canvas.create_line(*np.column_stack([x[known], y]).ravel().tolist(), fill=color)
+
+    def show_history(self):
+        EventWindow(self, f"History: {self.node.name}", self.history_store, dev_eui=self.node.dev_eui,
+                    refresh_interval=2000, history=True)
 
     def send_status_request(self):
         self.send_command(b'\x01', "Status request")
@@ -40,15 +109,25 @@ class NodeDetailDialog(tk.Toplevel):
 
     def send_command(self, command, command_name):
         logger.log(f"Sending {command_name} to device {self.node.dev_eui}")
-        try:
-            success, message = self.chirpstack_client.enqueue_downlink(self.node.dev_eui, command)
-            if success:
-                messagebox.showinfo("Command Sent", f"{command_name} sent successfully.")
-                logger.log(f"{command_name} sent successfully to device {self.node.dev_eui}")
-            else:
-                messagebox.showerror("Error", f"Failed to send {command_name}: {message}")
-                logger.log(f"Failed to send {command_name} to device {self.node.dev_eui}: {message}")
-        except Exception as e:
-            error_message = f"Unexpected error sending {command_name}: {str(e)}"
-            messagebox.showerror("Error", error_message)
-            logger.log(error_message)
\ No newline at end of file
+        self.chirpstack_client.enqueue_downlink(
+            self.node.dev_eui, command,
+            callback=lambda result: self.on_command_sent(command_name, result),
+            error_callback=lambda e: self.on_command_error(command_name, e)
+        )
+
+    def on_command_sent(self, command_name, result):
+        success, message = result
+        if success:
+            logger.log(f"{command_name} sent successfully to device {self.node.dev_eui}")
+            if self.winfo_exists():
+                messagebox.showinfo("Command Sent", f"{command_name} sent successfully.", parent=self)
+        else:
+            logger.log(f"Failed to send {command_name} to device {self.node.dev_eui}: {message}")
+            if self.winfo_exists():
+                messagebox.showerror("Error", f"Failed to send {command_name}: {message}", parent=self)
+
+    def on_command_error(self, command_name, error):
+        error_message = f"Unexpected error sending {command_name}: {str(error)}"
+        logger.log(error_message)
+        if self.winfo_exists():
+            messagebox.showerror("Error", error_message, parent=self)
\ No newline at end of file
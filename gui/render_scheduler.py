@@ -0,0 +1,34 @@
+class RenderScheduler:
+    """Coalesces widget repaints into at most one pass per frame.
+
+    mark_dirty() only records the widget. The first mark after a flush schedules
+    the next frame, which calls update_display() once on every widget marked in
+    the meantime, no matter how many times each one was marked.
+    """
+
+    def __init__(self, master, frame_interval=100):
+        self.master = master
+        self.frame_interval = frame_interval  # ms
+        self.dirty = {}  # insertion-ordered set of widgets
+        self.after_id = None
+
+    def mark_dirty(self, widget):
+        self.dirty[widget] = None
+        if self.after_id is None:
+            self.after_id = self.master.after(self.frame_interval, self.flush)
+
+    def discard(self, widget):
+        self.dirty.pop(widget, None)
+
+    def flush(self):
+        self.after_id = None
+        dirty, self.dirty = self.dirty, {}
+        for widget in dirty:
+            if widget.winfo_exists():
+                widget.update_display()
+
+    def cancel(self):
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+        self.dirty.clear()
@@ -25,4 +25,123 @@ class ScrollableFrame(ttk.Frame):
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
 
     def _on_mousewheel(self, event):
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
\ No newline at end of file
+        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+class VirtualNodeGrid(ttk.Frame):
+    """Scrollable grid of fixed-size tiles that only materializes what is in view.
+
+    Tiles are canvas windows taken from a pool that is just large enough for the
+    viewport plus overscan_rows above and below it. Pool widgets are re-bound to
+    whichever nodes scroll into view, so the widget count does not depend on the
+    number of nodes. create_block(node, master) builds a new pool widget.
+    """
+
+    def __init__(self, container, create_block, render_scheduler, tile_width, tile_height, overscan_rows=1,
+                 *args, **kwargs):
+        super().__init__(container, *args, **kwargs)
+        self.create_block = create_block
+        self.render_scheduler = render_scheduler
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.overscan_rows = overscan_rows
+        self.nodes = []
+        self.positions = {}  # dev_eui -> index in self.nodes
+        self.pool = []  # (block, canvas window id)
+        self.visible_slots = set()
+        self.first_index = 0
+        self.last_index = 0
+        self.scroll_region = None
+        self.redraw_id = None
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_view_changed)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+
+    def set_nodes(self, nodes):
+        self.nodes = list(nodes)
+        self.positions = {node.dev_eui: i for i, node in enumerate(self.nodes)}
+        self.schedule_redraw()
+
+    def add_nodes(self, nodes):
+        for node in nodes:
+            if node.dev_eui not in self.positions:
+                self.positions[node.dev_eui] = len(self.nodes)
+                self.nodes.append(node)
+        self.schedule_redraw()
+
+    def refresh_node(self, node):
+        index = self.positions.get(node.dev_eui)
+        if index is None or not self.first_index <= index < self.last_index:
+            return  # Off screen; it is drawn from the node's state when it scrolls into view
+        block = self.pool[index % len(self.pool)][0]
+        block.node = node
+        self.render_scheduler.mark_dirty(block)
+
+    def get_block(self, dev_eui):
+        index = self.positions.get(dev_eui)
+        if index is None or not self.first_index <= index < self.last_index:
+            return None
+        return self.pool[index % len(self.pool)][0]
+
+    def schedule_redraw(self):
+        if self.redraw_id is None:
+            self.redraw_id = self.after_idle(self.redraw)
+
+    def redraw(self):
+        self.redraw_id = None
+        columns = max(1, self.canvas.winfo_width() // self.tile_width)
+        rows = (len(self.nodes) + columns - 1) // columns
+        scroll_region = (0, 0, columns * self.tile_width, rows * self.tile_height)
+        if scroll_region != self.scroll_region:
+            self.scroll_region = scroll_region
+            self.canvas.configure(scrollregion=scroll_region)
+
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, int(top // self.tile_height) - self.overscan_rows)
+        last_row = int(bottom // self.tile_height) + self.overscan_rows
+        first = min(len(self.nodes), first_row * columns)
+        last = min(len(self.nodes), (last_row + 1) * columns)
+
+        # Grow the pool to the largest viewport seen; it never shrinks
+        while len(self.pool) < last - first:
+            block = self.create_block(self.nodes[first + len(self.pool)], self.canvas)
+            window = self.canvas.create_window(0, 0, window=block, anchor="nw", state="hidden",
+                                               width=self.tile_width - 10, height=self.tile_height - 10)
+            self.pool.append((block, window))
+
+        # A contiguous index range no longer than the pool maps to distinct slots, and a
+        # tile that stays in view keeps its slot while scrolling
+        used = set()
+        for index in range(first, last):
+            slot = index % len(self.pool)
+            block, window = self.pool[slot]
+            node = self.nodes[index]
+            if block.node is not node:
+                block.set_node(node)
+            elif slot not in self.visible_slots:
+                # Changes to the node were skipped while its tile was hidden
+                block.update_display()
+            row, col = divmod(index, columns)
+            self.canvas.coords(window, col * self.tile_width + 5, row * self.tile_height + 5)
+            self.canvas.itemconfigure(window, state="normal")
+            used.add(slot)
+        for slot, (block, window) in enumerate(self.pool):
+            if slot not in used:
+                self.canvas.itemconfigure(window, state="hidden")
+
+        self.visible_slots = used
+        self.first_index = first
+        self.last_index = last
+
+    def _on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_redraw()
+
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
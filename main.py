@@ -1,46 +1,81 @@
+import os
 import tkinter as tk
-from config.settings import load_config
+from config.settings import get_alert_options, get_mqtt_config, get_offline_timeouts, load_config
+from core.history_store import HistoryStore
+from core.monitor import Monitor
+from core.snapshot import DEFAULT_SNAPSHOT_FILE
 from gui.config_dialog import ConfigDialog
 from gui.main_window import MainWindow
-from networking.chirpstack_client import ChirpStackClient
+from networking.channel_manager import channel_manager
+from networking.monitor_api import ServiceWatcher, service_running
+from networking.mqtt_workers import DEFAULT_SHARE_GROUP
 from utils.logging_utils import logger
 
 
 def main():
+    config = load_config()
+    logger.set_level(config.get('log_level', 'info'))
+    logger.console = config.get('log_console', True)
     logger.start_logging()
 
     root = tk.Tk()
     root.withdraw()  # Hide the main window initially
 
-    config = load_config()
     config_dialog = ConfigDialog(root, config)
     root.wait_window(config_dialog)
 
     if config_dialog.config_complete:
         logger.log("Configuration completed successfully")
-        chirpstack_client = ChirpStackClient(
-            f"{config_dialog.config['server_address']}:{config_dialog.config['server_port']}",
-            config_dialog.config['api_token'],
-            config_dialog.config['app_id'],
-            config_dialog.config['tenant_id']
-        )
-
-        mqtt_config = {
-            'broker': config_dialog.config['mqtt_broker'],
-            'port': int(config_dialog.config['mqtt_port'])
-        }
+        chirpstack_client = config_dialog.client
+
+        history_store = HistoryStore(config_dialog.config.get('history_db', 'history.db'),
+                                     retention_days=config_dialog.config.get('history_retention_days', 30))
+        history_store.start()
+        chirpstack_client.history_store = history_store
+
+        mqtt_config = get_mqtt_config(config_dialog.config)
+        # A shared group of our own: joining the monitor service's group would make the
+        # broker split the uplinks between the two processes instead of copying them
+        mqtt_config['share_group'] = f"{mqtt_config.get('share_group') or DEFAULT_SHARE_GROUP}-gui-{os.getpid()}"
+        offline_timeouts = get_offline_timeouts(config_dialog.config)
+
+        service_host = config_dialog.config.get('service_host', '127.0.0.1')
+        service_port = config_dialog.config.get('service_port', 8765)
+        alert_fanout = config_dialog.config.get('gui_alert_fanout', 'auto')
+        # While a monitor service runs it sends the alert downlinks and stores history and the snapshot
+        primary = not service_running(service_host, service_port) if alert_fanout == 'auto' else bool(alert_fanout)
+        if not primary:
+            logger.log("Alert downlinks and history are left to the monitor service")
 
         root.deiconify()  # Show the main window
-        main_window = MainWindow(root, chirpstack_client, config_dialog.devices, mqtt_config)
-        root.protocol("WM_DELETE_WINDOW", lambda: on_closing(root, main_window))
+        monitor = Monitor(chirpstack_client, mqtt_config, offline_timeouts, history_store,
+                          snapshot_path=config_dialog.config.get('snapshot_file', DEFAULT_SNAPSHOT_FILE),
+                          alert_options=get_alert_options(config_dialog.config),
+                          primary=primary)
+        main_window = MainWindow(root, monitor, config_dialog.devices, snapshot=config_dialog.snapshot,
+                                 virtual_grid=config_dialog.config.get('virtual_grid', False))
+        service_watcher = None
+        if alert_fanout == 'auto':
+            # Take over if the service stops, and hand back to it when it returns
+            service_watcher = ServiceWatcher(service_host, service_port,
+                                             lambda running: monitor.set_primary(not running))
+            service_watcher.running = not primary
+            service_watcher.start()
+        root.protocol("WM_DELETE_WINDOW",
+                      lambda: on_closing(root, main_window, monitor, history_store, service_watcher))
         root.mainloop()
     else:
         logger.log("Configuration cancelled")
         root.destroy()  # Exit if configuration was cancelled
 
 
-def on_closing(root, main_window):
+def on_closing(root, main_window, monitor, history_store, service_watcher=None):
+    if service_watcher:
+        service_watcher.stop()
     main_window.on_closing()
+    monitor.stop()
+    history_store.close()
+    channel_manager.close_all()
     logger.stop_logging()
     root.destroy()
 
@@ -0,0 +1,72 @@
+import signal
+import threading
+from config.settings import get_alert_options, get_mqtt_config, get_offline_timeouts, load_config
+from core.history_store import HistoryStore
+from core.monitor import Monitor
+from core.snapshot import DEFAULT_SNAPSHOT_FILE, load_snapshot
+from networking.channel_manager import channel_manager
+from networking.chirpstack_client import ChirpStackClient
+from networking.monitor_api import create_server
+from utils.logging_utils import logger
+
+REQUIRED_KEYS = ('server_address', 'server_port', 'api_token', 'app_id', 'tenant_id', 'mqtt_broker', 'mqtt_port')
+
+
+def main():
+    """Run the monitor without a display, serving its state over HTTP.
+
+    Uses the config.json written by the GUI's configuration dialog.
+    """
+    config = load_config()
+    logger.set_level(config.get('log_level', 'info'))
+    logger.console = config.get('log_console', True)
+    logger.start_logging()
+
+    missing = [key for key in REQUIRED_KEYS if not config.get(key)]
+    if missing:
+        logger.log(f"Configuration incomplete, missing: {', '.join(missing)}")
+        logger.stop_logging()
+        return
+
+    chirpstack_client = ChirpStackClient(
+        f"{config['server_address']}:{config['server_port']}",
+        config['api_token'],
+        config['app_id'],
+        config['tenant_id'],
+        compression=config.get('grpc_compression') or None
+    )
+    history_store = HistoryStore(config.get('history_db', 'history.db'),
+                                 retention_days=config.get('history_retention_days', 30))
+    history_store.start()
+    chirpstack_client.history_store = history_store
+
+    snapshot_path = config.get('snapshot_file', DEFAULT_SNAPSHOT_FILE)
+    monitor = Monitor(chirpstack_client, get_mqtt_config(config), get_offline_timeouts(config), history_store,
+                      snapshot_path=snapshot_path, alert_options=get_alert_options(config))
+    snapshot = load_snapshot(snapshot_path, chirpstack_client.server, config['app_id'])
+    if snapshot is not None:
+        monitor.load_snapshot(snapshot)  # A wrong server or token shows up in the reconcile below
+    else:
+        monitor.load_nodes(chirpstack_client.iter_devices(config['app_id']))
+    monitor.start()
+    if snapshot is not None:
+        monitor.reconcile_in_background()
+
+    server = create_server(monitor, config.get('service_host', '127.0.0.1'), config.get('service_port', 8765))
+    # shutdown() waits for serve_forever() to return, so it can't run on the serving thread
+    stop = lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    logger.log(f"Monitor service listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        monitor.stop()
+        history_store.close()
+        channel_manager.close_all()
+        logger.stop_logging()
+
+
+if __name__ == "__main__":
+    main()
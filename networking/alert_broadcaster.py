@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from utils.logging_utils import logger
+
+DEADLINE_GRACE = 1.0  # seconds to wait past the deadline for enqueue calls already in flight
+
+
+class BroadcastResult:
+    def __init__(self, data, nodes, replace=()):
+        self.data = data
+        self.nodes = nodes
+        self.replace = replace  # dev_euis whose queue was flushed before the downlink
+        self.succeeded = []  # nodes whose downlink was enqueued
+        self.queue_item_ids = {}  # dev_eui -> ChirpStack queue item id of its downlink
+        self.failed = []  # (node, error message) pairs, including deadline misses
+        self.duration = 0.0  # seconds
+
+    @property
+    def total(self):
+        return len(self.nodes)
+
+    def summary(self):
+        return (f"Broadcast of [{self.data.hex()}] to {self.total} devices finished in {self.duration:.2f}s: "
+                f"{len(self.succeeded)} succeeded, {len(self.failed)} failed")
+
+
+class AlertBroadcaster:
+    """Sends the same downlink to many devices in parallel.
+
+    broadcast() only queues the job, so it is safe to call from the MQTT
+    network thread. A dispatcher thread runs one broadcast at a time, keeping at
+    most max_concurrency enqueue calls in flight and abandoning whatever is still
+    pending once the deadline (in seconds) has passed. Devices listed in
+    replace have their ChirpStack queue flushed first.
+    """
+
+    def __init__(self, chirpstack_client, max_concurrency=32, deadline=5.0):
+        self.chirpstack_client = chirpstack_client
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="alert-downlink")
+        self.jobs = queue.Queue()
+        self.dispatcher = threading.Thread(target=self._run, name="alert-broadcaster", daemon=True)
+        self.dispatcher.start()
+
+    def broadcast(self, nodes, data, on_complete=None, replace=()):
+        """Queue a broadcast; on_complete(result) is called from the dispatcher thread."""
+        self.jobs.put((list(nodes), data, on_complete, replace))
+
+    def shutdown(self):
+        self.jobs.put(None)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            nodes, data, on_complete, replace = job
+            result = self._send(nodes, data, replace)
+            logger.log(result.summary(), is_alert=True)
+            if on_complete:
+                try:
+                    on_complete(result)
+                except Exception as e:
+                    logger.log(f"Error in broadcast completion callback: {str(e)}")
+
+    def _send(self, nodes, data, replace=()):
+        result = BroadcastResult(data, nodes, replace)
+        start = time.monotonic()
+        deadline = start + self.deadline
+        futures = {self.executor.submit(self._enqueue, node.dev_eui, data, deadline, node.dev_eui in replace): node
+                   for node in nodes}
+        _, not_done = wait(futures, timeout=self.deadline)
+        # Calls that never started are dropped; ones in flight carry the same gRPC deadline,
+        # so give them a moment to report rather than guess their outcome
+        running = [future for future in not_done if not future.cancel()]
+        if running:
+            wait(running, timeout=DEADLINE_GRACE)
+
+        for future, node in futures.items():
+            if not future.done() or future.cancelled():
+                result.failed.append((node, "Broadcast deadline exceeded"))
+                continue
+            try:
+                success, message, queue_item_id = future.result()
+            except Exception as e:
+                success, message = False, str(e)
+            if success:
+                result.succeeded.append(node)
+                result.queue_item_ids[node.dev_eui] = queue_item_id
+            else:
+                result.failed.append((node, message))
+
+        result.duration = time.monotonic() - start
+        return result
+
+    def _enqueue(self, dev_eui, data, deadline, flush=False):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, "Broadcast deadline exceeded", None
+        if flush:
+            success, message = self.chirpstack_client.flush_device_queue(dev_eui, timeout=remaining)
+            if not success:
+                return success, message, None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False, "Broadcast deadline exceeded", None
+        return self.chirpstack_client.enqueue_downlink_item(dev_eui, data, timeout=remaining)
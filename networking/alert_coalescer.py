@@ -0,0 +1,76 @@
+import threading
+import time
+
+DEBOUNCE_WINDOW = 10.0  # seconds after a target got its alert downlink during which further alerts skip it
+STALE_AFTER = 120.0  # seconds an undelivered alert downlink may wait before it is replaced
+
+
+class AlertCoalescer:
+    """Keeps an alert storm down to one alert downlink per target.
+
+    A target is skipped while its downlink is being enqueued, while the queued
+    one hasn't been transmitted (no txack for its queue item yet) and for
+    window seconds after it was last sent. A queued downlink older than stale_after is replaced: the
+    target's queue is flushed and a fresh one enqueued, instead of stacking a
+    second copy behind it.
+    """
+
+    def __init__(self, window=DEBOUNCE_WINDOW, stale_after=STALE_AFTER):
+        self.window = window
+        self.stale_after = stale_after
+        self.in_flight = set()  # dev_euis handed to the broadcaster, not enqueued yet
+        self.pending = {}  # dev_eui -> (monotonic time enqueued, queue item id), until transmitted
+        self.last_sent = {}  # dev_eui -> monotonic time of its last enqueued downlink
+        self.coalesced = 0  # target downlinks saved so far
+        self._lock = threading.Lock()
+
+    def select(self, nodes):
+        """(nodes to send to, dev_euis among them whose stale queue item must be replaced)."""
+        now = time.monotonic()
+        send, replace = [], set()
+        with self._lock:
+            for node in nodes:
+                dev_eui = node.dev_eui
+                if dev_eui in self.in_flight:
+                    self.coalesced += 1
+                    continue
+                pending = self.pending.get(dev_eui)
+                if pending is not None:
+                    if now - pending[0] < self.stale_after:
+                        self.coalesced += 1
+                        continue
+                    replace.add(dev_eui)
+                elif now - self.last_sent.get(dev_eui, float("-inf")) < self.window:
+                    self.coalesced += 1
+                    continue
+                self.in_flight.add(dev_eui)
+                send.append(node)
+        return send, replace
+
+    def on_sent(self, dev_eui, success, queue_item_id=None):
+        with self._lock:
+            self.in_flight.discard(dev_eui)
+            if success:
+                now = time.monotonic()
+                self.pending[dev_eui] = (now, queue_item_id)
+                self.last_sent[dev_eui] = now
+
+    def on_transmitted(self, dev_eui, queue_item_id):
+        # Only the txack of our own queue item counts; campaign and other downlinks don't
+        with self._lock:
+            pending = self.pending.get(dev_eui)
+            if pending is not None and (pending[1] is None or pending[1] == queue_item_id):
+                del self.pending[dev_eui]
+
+    def forget(self, dev_eui):
+        with self._lock:
+            self.in_flight.discard(dev_eui)
+            self.pending.pop(dev_eui, None)
+            self.last_sent.pop(dev_eui, None)
+
+    def prune(self, keep):
+        """Forget every target whose dev_eui is not in keep."""
+        with self._lock:
+            tracked = self.in_flight | self.pending.keys() | self.last_sent.keys()
+        for dev_eui in tracked - set(keep):
+            self.forget(dev_eui)
@@ -0,0 +1,98 @@
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from utils.logging_utils import logger
+
+POLL_INTERVAL = 50  # ms between checks for finished calls
+
+
+class AsyncChirpStackClient:
+    """Non-blocking front end for ChirpStackClient.
+
+    Calls run on a bounded worker pool and return a concurrent.futures.Future.
+    Workers put optional callbacks on a results queue, and the Tk main loop
+    drains it with an after() poll, so they can update widgets directly. Tk is
+    never touched from a worker thread. Must be created on the Tk thread.
+    """
+
+    def __init__(self, client, master, max_workers=4):
+        self.client = client
+        self.master = master
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chirpstack")
+        self.results = queue.SimpleQueue()  # (callback, argument) pairs waiting for the Tk loop
+        self.poll_id = self.master.after(POLL_INTERVAL, self.dispatch_pending)
+
+    @property
+    def app_id(self):
+        return self.client.app_id
+
+    @property
+    def tenant_id(self):
+        return self.client.tenant_id
+
+    def submit(self, func, *args, callback=None, error_callback=None, **kwargs):
+        future = self.executor.submit(func, *args, **kwargs)
+        if callback or error_callback:
+            future.add_done_callback(lambda f: self._dispatch(f, callback, error_callback))
+        return future
+
+    def _dispatch(self, future, callback, error_callback):
+        # Runs on the worker thread; only hand results over to the Tk loop from here
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.log(f"ChirpStack call failed: {error}")
+            if error_callback:
+                self._call_in_main_loop(error_callback, error)
+        elif callback:
+            self._call_in_main_loop(callback, future.result())
+
+    def _call_in_main_loop(self, func, arg):
+        self.results.put((func, arg))
+
+    def dispatch_pending(self):
+        # Runs on the Tk loop
+        while True:
+            try:
+                func, arg = self.results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(arg)
+            except Exception as e:
+                logger.log(f"Error in ChirpStack callback: {str(e)}")
+        self.poll_id = self.master.after(POLL_INTERVAL, self.dispatch_pending)
+
+    def list_devices(self, application_id, callback=None, error_callback=None, timeout=None):
+        return self.submit(self.client.list_devices, application_id, timeout=timeout,
+                           callback=callback, error_callback=error_callback)
+
+    def get_device_status(self, dev_eui, callback=None, error_callback=None, timeout=None):
+        return self.submit(self.client.get_device_status, dev_eui, timeout=timeout,
+                           callback=callback, error_callback=error_callback)
+
+    def enqueue_downlink(self, dev_eui, data, confirmed=True, f_port=10, callback=None, error_callback=None,
+                         timeout=None):
+        return self.submit(self.client.enqueue_downlink, dev_eui, data, confirmed, f_port, timeout=timeout,
+                           callback=callback, error_callback=error_callback)
+
+    def get_device_profiles(self, callback=None, error_callback=None, timeout=None):
+        return self.submit(self.client.get_device_profiles, timeout=timeout,
+                           callback=callback, error_callback=error_callback)
+
+    def add_device(self, dev_eui, name, device_profile_id, application_id, nwk_key, device_type,
+                   callback=None, error_callback=None, timeout=None):
+        return self.submit(self.client.add_device, dev_eui, name, device_profile_id, application_id, nwk_key,
+                           device_type, timeout=timeout, callback=callback, error_callback=error_callback)
+
+    def remove_device(self, dev_eui, callback=None, error_callback=None, timeout=None):
+        return self.submit(self.client.remove_device, dev_eui, timeout=timeout,
+                           callback=callback, error_callback=error_callback)
+
+    def shutdown(self):
+        try:
+            self.master.after_cancel(self.poll_id)
+        except tk.TclError:
+            pass  # The main loop is already gone
+        self.executor.shutdown(wait=False, cancel_futures=True)
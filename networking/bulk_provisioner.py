@@ -0,0 +1,117 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import grpc
+from utils.logging_utils import logger
+
+DEFAULT_WORKERS = 8  # devices provisioned at once
+
+# Steps recorded in the progress file
+CREATED = "created"
+DONE = "done"
+
+
+def load_progress(path):
+    """dev_eui -> last completed step, from the progress file of an earlier run."""
+    progress = {}
+    if not path:
+        return progress
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partly written last line of an interrupted run
+                progress[entry['dev_eui']] = entry['step']
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.log(f"Cannot read provisioning progress {path}: {str(e)}")
+    return progress
+
+
+class ProvisionResult:
+    __slots__ = ('device', 'success', 'message')
+
+    def __init__(self, device, success, message):
+        self.device = device
+        self.success = success
+        self.message = message
+
+
+class BulkProvisioner:
+    """Create validated manifest devices on ChirpStack, several at a time.
+
+    Each device goes through Create and then CreateKeys. Completed steps are
+    appended to the progress file as they happen, so running the same import
+    again skips devices that are done and only sets the keys of devices that
+    were created before a failure or interruption.
+    """
+
+    def __init__(self, client, devices, progress_path=None, max_workers=DEFAULT_WORKERS, on_result=None):
+        self.client = client
+        self.devices = devices
+        self.progress_path = progress_path
+        self.max_workers = max_workers
+        self.on_result = on_result  # Called with each ProvisionResult, from a worker thread
+        self.progress = load_progress(progress_path)  # dev_eui -> last completed step
+        self.results = []
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def _record(self, dev_eui, step):
+        with self._lock:
+            self.progress[dev_eui] = step
+            if not self.progress_path:
+                return
+            try:
+                with open(self.progress_path, "a") as f:
+                    f.write(json.dumps({'dev_eui': dev_eui, 'step': step}) + "\n")
+            except OSError as e:
+                logger.log(f"Cannot write provisioning progress {self.progress_path}: {str(e)}")
+
+    def cancel(self):
+        # Devices already being provisioned finish; the rest are reported as cancelled
+        self._cancelled.set()
+
+    def run(self):
+        """Provision every device; returns the ProvisionResults in completion order."""
+        logger.log(f"Provisioning {len(self.devices)} devices with {self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="provision") as executor:
+            futures = [executor.submit(self._provision, device) for device in self.devices]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results.append(result)
+                if self.on_result:
+                    self.on_result(result)
+        succeeded = sum(result.success for result in self.results)
+        logger.log(f"Provisioning finished: {succeeded} succeeded, {len(self.results) - succeeded} failed")
+        return self.results
+
+    def _provision(self, device):
+        dev_eui = device['dev_eui']
+        step = self.progress.get(dev_eui)
+        if step == DONE:
+            return ProvisionResult(device, True, "Already provisioned")
+        if self._cancelled.is_set():
+            return ProvisionResult(device, False, "Cancelled")
+        try:
+            if step != CREATED:
+                self.client.create_device(dev_eui, device['name'], device['device_profile_id'],
+                                          self.client.app_id, device['device_type'])
+                self._record(dev_eui, CREATED)
+            self.client.create_device_keys(dev_eui, device['nwk_key'])
+            self._record(dev_eui, DONE)
+            return ProvisionResult(device, True, "Provisioned")
+        except grpc.RpcError as e:
+            message = f"{'CreateKeys' if self.progress.get(dev_eui) == CREATED else 'Create'} failed: {e.details()}"
+        except Exception as e:
+            message = f"Unexpected error: {str(e)}"
+        logger.log(f"Failed to provision {device['name']} ({dev_eui}): {message}")
+        return ProvisionResult(device, False, message)
+
+    def provisioned(self):
+        """(dev_eui, name, device_type) of every device provisioned so far, for Monitor.add_nodes."""
+        return [(result.device['dev_eui'], result.device['name'], result.device['device_type'])
+                for result in self.results if result.success]
@@ -0,0 +1,81 @@
+import json
+import threading
+import grpc
+from utils.logging_utils import logger
+
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),  # ping an idle connection every 30 s so dead links are noticed early
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Calls that are safe to repeat; Enqueue/Create/Delete are not retried
+IDEMPOTENT_METHODS = [
+    {"service": "api.DeviceService", "method": "Get"},
+    {"service": "api.DeviceService", "method": "List"},
+    {"service": "api.DeviceService", "method": "GetQueue"},
+    {"service": "api.DeviceService", "method": "FlushQueue"},
+    {"service": "api.DeviceProfileService", "method": "List"},
+]
+
+SERVICE_CONFIG = {
+    "methodConfig": [{
+        "name": IDEMPOTENT_METHODS,
+        "retryPolicy": {
+            "maxAttempts": 4,
+            "initialBackoff": "0.1s",
+            "maxBackoff": "2s",
+            "backoffMultiplier": 2,
+            "retryableStatusCodes": ["UNAVAILABLE", "RESOURCE_EXHAUSTED"],
+        },
+    }],
+}
+
+COMPRESSION = {"gzip": grpc.Compression.Gzip, "deflate": grpc.Compression.Deflate}
+
+
+class ChannelManager:
+    """One gRPC channel per ChirpStack server, shared by every client in the process.
+
+    Channels get keepalive pings, the retry policy above for idempotent calls
+    and, if asked for, message compression. A new channel starts connecting in
+    the background straight away, so the first user action or alert downlink
+    doesn't pay for the TCP/HTTP2 handshake.
+    """
+
+    def __init__(self):
+        self.channels = {}  # (server, compression) -> grpc.Channel
+        self._lock = threading.Lock()
+
+    def get_channel(self, server, compression=None):
+        """Shared channel to server; compression is None, "gzip" or "deflate".
+
+        The server must accept the chosen compression (ChirpStack only does if
+        it was built and configured for it).
+        """
+        key = (server, compression)
+        with self._lock:
+            channel = self.channels.get(key)
+            if channel is None:
+                options = KEEPALIVE_OPTIONS + [
+                    ("grpc.enable_retries", 1),
+                    ("grpc.service_config", json.dumps(SERVICE_CONFIG)),
+                ]
+                channel = grpc.insecure_channel(server, options=options, compression=COMPRESSION.get(compression))
+                channel.subscribe(lambda state: self._on_state_change(server, state), try_to_connect=True)
+                self.channels[key] = channel
+            return channel
+
+    def _on_state_change(self, server, state):
+        logger.debug("gRPC channel to %s: %s", server, state.name)
+
+    def close_all(self):
+        with self._lock:
+            channels = list(self.channels.values())
+            self.channels = {}
+        for channel in channels:
+            channel.close()
+
+
+channel_manager = ChannelManager()  # Process-wide instance
@@ -1,34 +1,96 @@
 import grpc
+from concurrent.futures import ThreadPoolExecutor
 from chirpstack_api import api
 from google.protobuf.json_format import MessageToDict
 from datetime import datetime, timedelta
+from .channel_manager import channel_manager
+from .metadata_cache import MetadataCache
 from utils.logging_utils import logger
 
+DEFAULT_TIMEOUT = 10  # seconds, for RPCs without an entry in RPC_DEADLINES
+RPC_DEADLINES = {  # seconds; short for interactive calls and downlinks, longer for listings and provisioning
+    "Get": 5,
+    "List": 15,
+    "Enqueue": 5,
+    "GetQueue": 5,
+    "FlushQueue": 5,
+    "Create": 10,
+    "CreateKeys": 10,
+    "Delete": 10,
+    "ListDeviceProfiles": 10,
+}
+PROFILES_TTL = 300  # seconds device profiles are served from the cache
+DEVICE_TTL = 30  # seconds a device's details are served from the cache
+PROFILES_PAGE_SIZE = 100
+
+
 class ChirpStackClient:
-    def __init__(self, server, api_token, app_id, tenant_id):
+    def __init__(self, server, api_token, app_id, tenant_id, timeout=None, compression=None):
         self.server = server
         self.api_token = api_token
         self.app_id = app_id
         self.tenant_id = tenant_id
-        self.channel = grpc.insecure_channel(self.server)
+        self.timeout = timeout  # Overrides RPC_DEADLINES for every call if set
+        self.history_store = None  # Optional core.history_store.HistoryStore backing the log queries
+        # Built once; every call sends the same tuple
+        self.metadata = (("authorization", f"Bearer {api_token}"),)
+        self.channel = channel_manager.get_channel(self.server, compression)
+        self.cache = MetadataCache()
         self.device_service = api.DeviceServiceStub(self.channel)
         self.device_profile_service = api.DeviceProfileServiceStub(self.channel)
         logger.log(f"ChirpStack client initialized for server: {server}")
 
     def _get_metadata(self):
-        return [("authorization", f"Bearer {self.api_token}")]
+        return self.metadata
+
+    def _get_timeout(self, timeout, rpc=None):
+        if timeout is not None:
+            return timeout
+        if self.timeout is not None:
+            return self.timeout
+        return RPC_DEADLINES.get(rpc, DEFAULT_TIMEOUT)
 
-    def list_devices(self, application_id):
+    def list_devices(self, application_id, timeout=None):
+        return list(self.iter_devices(application_id, timeout=timeout))
+
+    def iter_devices(self, application_id, page_size=100, timeout=None):
+        """Yield every device of the application, one page at a time.
+
+        The next page is requested in the background while the current one is
+        being consumed, and devices are converted to dicts only as they are yielded.
+        The timeout applies to each page request.
+        """
         logger.log(f"Fetching devices for application ID: {application_id}")
-        req = api.ListDevicesRequest(application_id=application_id, limit=100)
-        resp = self.device_service.List(req, metadata=self._get_metadata())
-        return [MessageToDict(device) for device in resp.result]
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            offset = 0
+            page = prefetcher.submit(self._list_devices_page, application_id, offset, page_size, timeout)
+            while page is not None:
+                resp = page.result()
+                offset += len(resp.result)
+                if resp.result and offset < resp.total_count:
+                    page = prefetcher.submit(self._list_devices_page, application_id, offset, page_size, timeout)
+                else:
+                    page = None
+                for device in resp.result:
+                    yield MessageToDict(device)
+            logger.log(f"Fetched {offset} devices for application ID: {application_id}")
+
+    def _list_devices_page(self, application_id, offset, limit, timeout=None):
+        req = api.ListDevicesRequest(application_id=application_id, limit=limit, offset=offset)
+        return self.device_service.List(req, metadata=self._get_metadata(), timeout=self._get_timeout(timeout, "List"))
 
-    def get_device_status(self, dev_eui):
-        logger.log(f"Getting status for device: {dev_eui}")
+    def get_device(self, dev_eui, timeout=None):
+        """Device details as returned by ChirpStack, cached for DEVICE_TTL seconds."""
+        return self.cache.get(("device", dev_eui), lambda: self._get_device(dev_eui, timeout), DEVICE_TTL)
+
+    def _get_device(self, dev_eui, timeout=None):
+        logger.debug("Getting device: %s", dev_eui)
         req = api.GetDeviceRequest(dev_eui=dev_eui)
-        resp = self.device_service.Get(req, metadata=self._get_metadata())
-        device = MessageToDict(resp.device)
+        resp = self.device_service.Get(req, metadata=self._get_metadata(), timeout=self._get_timeout(timeout, "Get"))
+        return MessageToDict(resp.device)
+
+    def get_device_status(self, dev_eui, timeout=None):
+        device = self.get_device(dev_eui, timeout)
         last_seen = device.get('lastSeenAt')
         if last_seen:
             last_seen_dt = datetime.fromtimestamp(int(last_seen.split('.')[0]))
@@ -38,9 +100,14 @@ class ChirpStackClient:
             is_online = False
         return {"last_seen": last_seen_dt, "is_online": is_online}
 
-    def enqueue_downlink(self, dev_eui, data, confirmed=True, f_port=10):
+    def enqueue_downlink(self, dev_eui, data, confirmed=True, f_port=10, timeout=None):
         """Enqueue a downlink message to a device."""
-        logger.log(f"Enqueueing downlink for device {dev_eui}: {data.hex()}")
+        success, message, _ = self.enqueue_downlink_item(dev_eui, data, confirmed, f_port, timeout)
+        return success, message
+
+    def enqueue_downlink_item(self, dev_eui, data, confirmed=True, f_port=10, timeout=None):
+        """Like enqueue_downlink, plus the id ChirpStack gave the queue item (None on failure)."""
+        logger.debug("Enqueueing downlink for device %s: %s", dev_eui, data.hex())
 
         req = api.EnqueueDeviceQueueItemRequest()
         req.queue_item.dev_eui = dev_eui
@@ -49,45 +116,59 @@ class ChirpStackClient:
         req.queue_item.f_port = f_port
 
         try:
-            response = self.device_service.Enqueue(req, metadata=self._get_metadata())
-            logger.log(f"Downlink enqueued successfully. Response: {response}")
-            return True, "Command enqueued successfully."
+            response = self.device_service.Enqueue(req, metadata=self._get_metadata(),
+                                                   timeout=self._get_timeout(timeout, "Enqueue"))
+            logger.debug("Downlink enqueued successfully. Response: %s", response)
+            return True, "Command enqueued successfully.", response.id
         except grpc.RpcError as e:
             error_message = f"Failed to enqueue command: {e.details()}"
             logger.log(error_message)
-            return False, error_message
+            return False, error_message, None
         except Exception as e:
             error_message = f"Unexpected error enqueueing downlink: {str(e)}"
             logger.log(error_message)
+            return False, error_message, None
+
+    def flush_device_queue(self, dev_eui, timeout=None):
+        """Remove every downlink waiting in the device's queue."""
+        logger.debug("Flushing downlink queue of device %s", dev_eui)
+        req = api.FlushDeviceQueueRequest(dev_eui=dev_eui)
+        try:
+            self.device_service.FlushQueue(req, metadata=self._get_metadata(),
+                                           timeout=self._get_timeout(timeout, "FlushQueue"))
+            return True, "Queue flushed."
+        except grpc.RpcError as e:
+            error_message = f"Failed to flush queue: {e.details()}"
+            logger.log(error_message)
             return False, error_message
 
-    def get_device_profiles(self):
-        req = api.ListDeviceProfilesRequest(tenant_id=self.tenant_id, limit=100)
-        resp = self.device_profile_service.List(req, metadata=self._get_metadata())
-        return [MessageToDict(profile) for profile in resp.result]
+    def get_queue_depth(self, dev_eui, timeout=None):
+        """Number of downlinks waiting in the device's ChirpStack queue."""
+        req = api.GetDeviceQueueItemsRequest(dev_eui=dev_eui, count_only=True)
+        resp = self.device_service.GetQueue(req, metadata=self._get_metadata(),
+                                            timeout=self._get_timeout(timeout, "GetQueue"))
+        return resp.total_count
+
+    def get_device_profiles(self, timeout=None):
+        """All device profiles of the tenant, cached for PROFILES_TTL seconds."""
+        return self.cache.get(("profiles", self.tenant_id), lambda: self._list_device_profiles(timeout), PROFILES_TTL)
+
+    def _list_device_profiles(self, timeout=None):
+        profiles = []
+        while True:
+            req = api.ListDeviceProfilesRequest(tenant_id=self.tenant_id, limit=PROFILES_PAGE_SIZE,
+                                                offset=len(profiles))
+            resp = self.device_profile_service.List(req, metadata=self._get_metadata(),
+                                                    timeout=self._get_timeout(timeout, "ListDeviceProfiles"))
+            profiles.extend(MessageToDict(profile) for profile in resp.result)
+            if not resp.result or len(profiles) >= resp.total_count:
+                return profiles
 
-    def add_device(self, dev_eui, name, device_profile_id, application_id, nwk_key, device_type):
+    def add_device(self, dev_eui, name, device_profile_id, application_id, nwk_key, device_type, timeout=None):
         logger.log(f"Adding new device: {name} ({dev_eui})")
         try:
-            device = api.Device(
-                dev_eui=dev_eui,
-                name=name,
-                description=device_type,
-                application_id=application_id,
-                device_profile_id=device_profile_id
-            )
-            req = api.CreateDeviceRequest(device=device)
-            self.device_service.Create(req, metadata=self._get_metadata())
-
-            # Set device keys
-            keys_req = api.CreateDeviceKeysRequest(
-                device_keys=api.DeviceKeys(
-                    dev_eui=dev_eui,
-                    nwk_key=nwk_key
-                )
-            )
-            self.device_service.CreateKeys(keys_req, metadata=self._get_metadata())
-
+            self.create_device(dev_eui, name, device_profile_id, application_id, device_type, timeout)
+            self.create_device_keys(dev_eui, nwk_key, timeout)
             logger.log(f"Device {name} ({dev_eui}) added successfully with keys")
             return True, "Device added successfully"
         except grpc.RpcError as e:
@@ -99,16 +180,47 @@ class ChirpStackClient:
             logger.log(error_message)
             return False, error_message
 
-    def remove_device(self, dev_eui):
+    def create_device(self, dev_eui, name, device_profile_id, application_id, device_type, timeout=None):
+        """First half of add_device; raises grpc.RpcError on failure."""
+        try:
+            device = api.Device(
+                dev_eui=dev_eui,
+                name=name,
+                description=device_type,
+                application_id=application_id,
+                device_profile_id=device_profile_id
+            )
+            req = api.CreateDeviceRequest(device=device)
+            self.device_service.Create(req, metadata=self._get_metadata(), timeout=self._get_timeout(timeout, "Create"))
+        finally:
+            self.cache.invalidate(("device", dev_eui))
+
+    def create_device_keys(self, dev_eui, nwk_key, timeout=None):
+        """Second half of add_device; raises grpc.RpcError on failure."""
+        keys_req = api.CreateDeviceKeysRequest(
+            device_keys=api.DeviceKeys(
+                dev_eui=dev_eui,
+                nwk_key=nwk_key
+            )
+        )
+        self.device_service.CreateKeys(keys_req, metadata=self._get_metadata(),
+                                       timeout=self._get_timeout(timeout, "CreateKeys"))
+
+    def remove_device(self, dev_eui, timeout=None):
         req = api.DeleteDeviceRequest(dev_eui=dev_eui)
-        self.device_service.Delete(req, metadata=self._get_metadata())
+        try:
+            self.device_service.Delete(req, metadata=self._get_metadata(), timeout=self._get_timeout(timeout, "Delete"))
+        finally:
+            self.cache.invalidate(("device", dev_eui))
+
+    def get_alert_log(self, limit=1000, **filters):
+        return self._get_history_log(alerts_only=True, limit=limit, **filters)
 
-    def get_alert_log(self):
-        # Implement method to retrieve alert log
-        # This is a placeholder and should be implemented based on your specific requirements
-        return "Alert log placeholder"
+    def get_general_log(self, limit=1000, **filters):
+        return self._get_history_log(limit=limit, **filters)
 
-    def get_general_log(self):
-        # Implement method to retrieve general log
-        # This is a placeholder and should be implemented based on your specific requirements
-        return "General log placeholder"
\ No newline at end of file
+    def _get_history_log(self, **query):
+        # Newest `limit` stored events as log lines; filters are those of HistoryStore.query
+        if self.history_store is None:
+            return "No history store configured"
+        return "\n".join(event.format() for event in self.history_store.query(**query))
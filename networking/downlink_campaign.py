@@ -0,0 +1,228 @@
+import heapq
+import itertools
+import threading
+import time
+import grpc
+from utils.logging_utils import logger
+
+COMMANDS = {
+    b'\x01': "Status request",
+    b'\x02': "Reset request",
+    b'\x03': "Data collection request",
+}
+GATEWAY_INTERVAL = 2.0  # seconds between enqueues for devices last heard by the same gateway
+DEVICE_INTERVAL = 60.0  # seconds between campaign downlinks to the same device
+MAX_QUEUE_DEPTH = 1  # a device with this many queued downlinks is retried later instead
+QUEUE_RETRY = 30.0  # seconds before a device with a full queue is tried again
+MAX_DEFERRALS = 10  # retries for a full queue before the device is given up on
+CAMPAIGN_HISTORY = 50  # most recent campaigns kept for progress reporting
+
+
+class Campaign:
+    """One command sent to a group of devices, and how far it has got."""
+
+    def __init__(self, campaign_id, name, data, nodes, on_result=None, on_complete=None):
+        self.campaign_id = campaign_id
+        self.name = name
+        self.data = data
+        self.nodes = nodes
+        self.on_result = on_result  # on_result(campaign, node, success, message), from the scheduler thread
+        self.on_complete = on_complete  # on_complete(campaign), from the scheduler thread
+        self.sent = []  # nodes whose downlink was enqueued
+        self.failed = []  # (node, error message) pairs
+        self.deferrals = 0  # times a device had to wait for its queue to drain
+        self.cancelled = False
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @property
+    def total(self):
+        return len(self.nodes)
+
+    @property
+    def done(self):
+        return len(self.sent) + len(self.failed)
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def summary(self):
+        duration = (self.finished_at or time.time()) - self.started_at
+        state = "cancelled" if self.cancelled else "finished" if self.finished else "running"
+        return (f"{self.name} [{self.data.hex()}] to {self.total} devices {state} after {duration:.0f}s: "
+                f"{len(self.sent)} sent, {len(self.failed)} failed, {self.deferrals} deferred for a full queue")
+
+    def to_dict(self):
+        return {
+            'id': self.campaign_id,
+            'name': self.name,
+            'data': self.data.hex(),
+            'total': self.total,
+            'sent': len(self.sent),
+            'failed': len(self.failed),
+            'deferrals': self.deferrals,
+            'cancelled': self.cancelled,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class CampaignScheduler:
+    """Paces group downlinks so a campaign doesn't swamp gateways or device queues.
+
+    A background thread works through a schedule of (campaign, device) entries.
+    Enqueues for devices behind the same gateway (the one that last heard them,
+    from gateway_of(dev_eui)) are spaced gateway_interval apart, since each one
+    costs that gateway airtime under its duty cycle limit, and a device gets at
+    most one campaign downlink per device_interval. Class A devices only take a
+    downlink after an uplink, so a device whose ChirpStack queue already holds
+    max_queue_depth items is retried later rather than having more stacked on.
+    """
+
+    def __init__(self, chirpstack_client, gateway_of=None, gateway_interval=GATEWAY_INTERVAL,
+                 device_interval=DEVICE_INTERVAL, max_queue_depth=MAX_QUEUE_DEPTH, queue_retry=QUEUE_RETRY,
+                 max_deferrals=MAX_DEFERRALS):
+        self.chirpstack_client = chirpstack_client
+        self.gateway_of = gateway_of or (lambda dev_eui: None)
+        self.gateway_interval = gateway_interval
+        self.device_interval = device_interval
+        self.max_queue_depth = max_queue_depth
+        self.queue_retry = queue_retry
+        self.max_deferrals = max_deferrals
+        self.campaigns = []
+        self.schedule = []  # heap of (due, seq, campaign, node, deferrals)
+        self.gateway_next = {}  # gateway id (None if unknown) -> earliest next enqueue, monotonic
+        self.device_next = {}  # dev_eui -> earliest next enqueue, monotonic
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._stopping = False
+        self._condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="downlink-campaigns", daemon=True)
+        self.thread.start()
+
+    def submit(self, nodes, data, name=None, on_result=None, on_complete=None):
+        """Start sending data to every node; returns the Campaign to follow its progress."""
+        nodes = list(nodes)
+        campaign = Campaign(next(self._ids), name or COMMANDS.get(data, "Downlink"), data, nodes,
+                            on_result, on_complete)
+        logger.log(f"Campaign {campaign.campaign_id}: {campaign.name} to {len(nodes)} devices")
+        with self._condition:
+            self.campaigns.append(campaign)
+            del self.campaigns[:-CAMPAIGN_HISTORY]
+            now = time.monotonic()
+            for node in nodes:
+                heapq.heappush(self.schedule, (now, next(self._seq), campaign, node, 0))
+            self._condition.notify()
+        if not nodes:
+            self._complete(campaign)
+        return campaign
+
+    def cancel(self, campaign):
+        # A downlink already being enqueued still finishes
+        with self._condition:
+            campaign.cancelled = True
+            dropped = [entry[3] for entry in self.schedule if entry[2] is campaign]
+            self.schedule = [entry for entry in self.schedule if entry[2] is not campaign]
+            heapq.heapify(self.schedule)
+        for node in dropped:
+            self._record(campaign, node, False, "Cancelled")
+
+    def snapshot(self):
+        """to_dict() of every recent campaign, taken together under the scheduler lock."""
+        with self._condition:
+            return [campaign.to_dict() for campaign in self.campaigns]
+
+    def progress(self, campaign):
+        """(done, summary, finished) for campaign, read under the scheduler lock."""
+        with self._condition:
+            return campaign.done, campaign.summary(), campaign.finished
+
+    def shutdown(self):
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+    def _next_due(self):
+        # Waits for the next entry that may be sent now and reserves its gateway and device slots
+        with self._condition:
+            while not self._stopping:
+                if not self.schedule:
+                    self._condition.wait()
+                    continue
+                due = self.schedule[0][0]
+                now = time.monotonic()
+                if due > now:
+                    self._condition.wait(due - now)
+                    continue
+                entry = heapq.heappop(self.schedule)
+                node = entry[3]
+                gateway = self.gateway_of(node.dev_eui)
+                slot = max(self.gateway_next.get(gateway, 0), self.device_next.get(node.dev_eui, 0))
+                if slot > now:
+                    heapq.heappush(self.schedule, (slot,) + entry[1:])
+                    continue
+                self.gateway_next[gateway] = now + self.gateway_interval
+                self.device_next[node.dev_eui] = now + self.device_interval
+                return entry
+        return None
+
+    def _run(self):
+        while True:
+            entry = self._next_due()
+            if entry is None:
+                break
+            _, _, campaign, node, deferrals = entry
+            try:
+                self._send(campaign, node, deferrals)
+            except Exception as e:
+                self._record(campaign, node, False, f"Unexpected error: {str(e)}")
+
+    def _send(self, campaign, node, deferrals):
+        try:
+            depth = self.chirpstack_client.get_queue_depth(node.dev_eui)
+        except grpc.RpcError as e:
+            self._record(campaign, node, False, f"Failed to read device queue: {e.details()}")
+            return
+        if depth >= self.max_queue_depth:
+            if deferrals >= self.max_deferrals:
+                self._record(campaign, node, False, f"Device queue still holds {depth} downlinks")
+                return
+            with self._condition:
+                if not campaign.cancelled:
+                    campaign.deferrals += 1
+                    # The reserved slot went unused; don't hold up the device's next try
+                    self.device_next.pop(node.dev_eui, None)
+                    heapq.heappush(self.schedule, (time.monotonic() + self.queue_retry, next(self._seq),
+                                                   campaign, node, deferrals + 1))
+                    self._condition.notify()
+                    return
+            self._record(campaign, node, False, "Cancelled")
+            return
+        success, message = self.chirpstack_client.enqueue_downlink(node.dev_eui, campaign.data)
+        self._record(campaign, node, success, message)
+
+    def _record(self, campaign, node, success, message):
+        with self._condition:
+            if success:
+                campaign.sent.append(node)
+            else:
+                campaign.failed.append((node, message))
+            complete = campaign.done == campaign.total
+        if campaign.on_result:
+            try:
+                campaign.on_result(campaign, node, success, message)
+            except Exception as e:
+                logger.log(f"Error in campaign result callback: {str(e)}")
+        if complete:
+            self._complete(campaign)
+
+    def _complete(self, campaign):
+        with self._condition:
+            campaign.finished_at = time.time()
+        logger.log(f"Campaign {campaign.campaign_id}: {campaign.summary()}")
+        if campaign.on_complete:
+            try:
+                campaign.on_complete(campaign)
+            except Exception as e:
+                logger.log(f"Error in campaign completion callback: {str(e)}")
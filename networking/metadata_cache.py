@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """A load in progress that other callers of the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MetadataCache:
+    """Thread-safe TTL cache with LRU eviction and single-flight loading.
+
+    Concurrent get() calls for a key that isn't cached share one call of the
+    loader instead of each issuing their own request. A key invalidated while
+    its load is in flight is not stored, so the result of a request that raced
+    a change can't outlive it.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self.inflight = {}  # key -> _Flight
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, ttl=None):
+        """Cached value for key, calling loader() to fetch it if missing or expired.
+
+        Errors from the loader propagate to every caller waiting on it and are not cached.
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self.entries[key]
+            self.misses += 1
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                if self.inflight.get(key) is flight:
+                    self.entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), flight.value)
+                    while len(self.entries) > self.max_entries:
+                        self.entries.popitem(last=False)
+            return flight.value
+        finally:
+            with self._lock:
+                if self.inflight.get(key) is flight:
+                    del self.inflight[key]
+            flight.done.set()
+
+    def invalidate(self, key):
+        with self._lock:
+            self.entries.pop(key, None)
+            self.inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.inflight.clear()
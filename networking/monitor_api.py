@@ -0,0 +1,130 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
+from urllib.parse import parse_qs, urlparse
+from urllib.request import urlopen
+from utils.logging_utils import logger
+
+DEFAULT_EVENT_LIMIT = 500
+
+
+class MonitorRequestHandler(BaseHTTPRequestHandler):
+    """Read-only JSON API over a Monitor (self.server.monitor).
+
+    GET /nodes                 state of every node
+    GET /nodes/<dev_eui>       state of one node
+    GET /events                recent events; filters dev_eui, type, minutes, limit
+    GET /alerts                recent alert events; same filters
+    GET /deltas?since=<n>      nodes changed since version n, plus the new version
+    GET /metrics               MQTT ingest counters and node counts per status
+    GET /campaigns             progress of recent group downlink campaigns
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+        monitor = self.server.monitor
+        try:
+            if parts == ["nodes"]:
+                self.send_json({'version': monitor.version, 'nodes': monitor.get_nodes_state()})
+            elif len(parts) == 2 and parts[0] == "nodes":
+                nodes = monitor.get_nodes_state([parts[1]])
+                if nodes:
+                    self.send_json(nodes[0])
+                else:
+                    self.send_json({'error': f"Unknown node {parts[1]}"}, 404)
+            elif parts in (["events"], ["alerts"]):
+                events = monitor.event_store.query(**self.event_query(query, alerts_only=parts == ["alerts"]))
+                self.send_json({'events': [event.to_dict() for event in events]})
+            elif parts == ["deltas"]:
+                version, layout_changed, changed = monitor.deltas_since(int(query.get('since', 0)))
+                # After a layout change the client should reload /nodes
+                self.send_json({'version': version, 'layout_changed': layout_changed,
+                                'nodes': monitor.get_nodes_state(changed)})
+            elif parts == ["metrics"]:
+                self.send_json(dict(monitor.mqtt_client.get_metrics(), nodes=monitor.count_by_status()))
+            elif parts == ["campaigns"]:
+                self.send_json({'campaigns': monitor.campaign_scheduler.snapshot()})
+            else:
+                self.send_json({'error': "Not found"}, 404)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, 400)
+        except Exception as e:
+            logger.log(f"Error serving {self.path}: {str(e)}")
+            self.send_json({'error': "Internal server error"}, 500)
+
+    @staticmethod
+    def event_query(query, alerts_only=False):
+        event_query = {'alerts_only': alerts_only, 'limit': int(query.get('limit', DEFAULT_EVENT_LIMIT))}
+        if query.get('dev_eui'):
+            event_query['dev_eui'] = query['dev_eui']
+        if query.get('type'):
+            event_query['event_type'] = query['type']
+        if query.get('minutes'):
+            event_query['start'] = datetime.now() - timedelta(minutes=float(query['minutes']))
+        return event_query
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("HTTP %s - %s", self.address_string(), format % args)
+
+
+def create_server(monitor, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), MonitorRequestHandler)
+    server.daemon_threads = True
+    server.monitor = monitor
+    return server
+
+
+def service_running(host="127.0.0.1", port=8765, timeout=1.0):
+    """Whether a monitor service answers at host:port."""
+    try:
+        with urlopen(f"http://{host}:{port}/metrics", timeout=timeout) as response:
+            return response.status == 200
+    except (URLError, OSError, ValueError):
+        return False
+
+
+class ServiceWatcher:
+    """Checks for a monitor service every interval seconds on a background thread.
+
+    on_change(running) is called from that thread whenever the service appears
+    or goes away, and once with the result of the first check.
+    """
+
+    def __init__(self, host, port, on_change, interval=10.0):
+        self.host = host
+        self.port = port
+        self.on_change = on_change
+        self.interval = interval
+        self.running = None
+        self._stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="service-watcher", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _run(self):
+        while True:
+            running = service_running(self.host, self.port)
+            if running != self.running:
+                self.running = running
+                try:
+                    self.on_change(running)
+                except Exception as e:
+                    logger.log(f"Error in service watcher callback: {str(e)}")
+            if self._stopping.wait(self.interval):
+                break
@@ -1,15 +1,58 @@
 import paho.mqtt.client as mqtt
 import json
-from typing import Callable
+import queue
+from .mqtt_events import decode_event, get_decoder, parse_topic
+from utils.logging_utils import logger
+from typing import Callable, Iterable, List, Optional
+
+
+def build_topics(app_ids: Optional[Iterable[str]] = None, event_types: Optional[Iterable[str]] = None,
+                 share_group: Optional[str] = None) -> List[str]:
+    """Subscription filters for the given applications and event types (all if None).
+
+    With share_group the filters become MQTT shared subscriptions, so the broker
+    spreads messages across every client subscribed with the same group.
+    """
+    apps = sorted(app_ids) if app_ids else ["+"]
+    types = sorted(event_types) if event_types is not None else ["#"]
+    prefix = f"$share/{share_group}/" if share_group else ""
+    return [f"{prefix}application/{app}/device/+/event/{event_type}" for app in apps for event_type in types]
+
 
 class MQTTClient:
-    def __init__(self, broker: str, port: int, on_message: Callable):
-        self.client = mqtt.Client()
-        self.client.on_connect = self._on_connect
-        self.client.on_message = self._on_message
+    """Receives ChirpStack events on paho's network thread and buffers them.
+
+    The topic is parsed first and events whose type is not in event_types are
+    dropped before their payload is decoded. The rest are decoded into
+    DeviceEvent records, put on a bounded ingest queue and handed to on_message
+    only from dispatch_pending(), which the owner calls from its own thread
+    (the Tk main loop). When the queue is full new messages are dropped and
+    counted rather than blocking paho.
+    """
+
+    def __init__(self, broker: str, port: int, on_message: Callable, max_queue_size: int = 10000,
+                 event_types: Optional[Iterable[str]] = None, decoder: Optional[str] = None,
+                 app_ids: Optional[Iterable[str]] = None):
+        self.client = self._create_client()
         self.broker = broker
         self.port = port
         self.user_on_message = on_message
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.app_ids = frozenset(app_id for app_id in app_ids or () if app_id)
+        self.decoder = decoder
+        self.loads = get_decoder(decoder)
+        self.ingest_queue = queue.Queue(maxsize=max_queue_size)
+        self.received_count = 0
+        self.dropped_count = 0
+        self.filtered_count = 0
+        self.decode_error_count = 0
+        self.high_water_mark = 0
+
+    def _create_client(self):
+        client = mqtt.Client()
+        client.on_connect = self._on_connect
+        client.on_message = self._on_message
+        return client
 
     def connect(self):
         self.client.connect(self.broker, self.port, 60)
@@ -20,15 +63,67 @@ class MQTTClient:
         self.client.disconnect()
 
     def _on_connect(self, client, userdata, flags, rc):
-        print(f"Connected with result code {rc}")
-        self.client.subscribe("application/+/device/+/event/#")
+        logger.info("Connected with result code %s", rc)
+        topics = build_topics(self.app_ids, self.event_types)
+        self.client.subscribe([(topic, 0) for topic in topics])
+        logger.info("Subscribed to %s", ", ".join(topics))
 
     def _on_message(self, client, userdata, msg):
+        topic_parts = parse_topic(msg.topic)
+        if topic_parts is None or (self.event_types is not None and topic_parts[2] not in self.event_types):
+            self.filtered_count += 1
+            return
+        try:
+            event = decode_event(topic_parts, msg.payload, self.loads)
+        except ValueError:  # Also covers JSONDecodeError and orjson/ujson decode errors
+            self.decode_error_count += 1
+            logger.info("Failed to decode message on %s: %s", msg.topic, msg.payload)
+            return
+        self._enqueue(event)
+
+    def _enqueue(self, item):
         try:
-            payload = json.loads(msg.payload.decode())
-            self.user_on_message(msg.topic, payload)
-        except json.JSONDecodeError:
-            print(f"Failed to decode message: {msg.payload}")
+            self.ingest_queue.put_nowait(item)
+        except queue.Full:
+            self.dropped_count += 1
+            if self.dropped_count % 1000 == 1:
+                logger.info("MQTT ingest queue full, %d messages dropped so far", self.dropped_count)
+            return
+        self.received_count += 1
+        depth = self.ingest_queue.qsize()
+        if depth > self.high_water_mark:
+            self.high_water_mark = depth
+
+    def dispatch_pending(self, max_messages: int = 500, timeout: float = 0) -> int:
+        """Pass up to max_messages queued messages to on_message on the calling thread.
+
+        If the queue is empty, waits up to timeout seconds for the first message.
+        """
+        dispatched = 0
+        while dispatched < max_messages:
+            try:
+                if timeout and not dispatched:
+                    event = self.ingest_queue.get(timeout=timeout)
+                else:
+                    event = self.ingest_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self.user_on_message(event)
+            except Exception as e:
+                logger.info("Error handling %r: %s", event, str(e))
+            dispatched += 1
+        return dispatched
+
+    def get_metrics(self) -> dict:
+        return {
+            'queue_depth': self.ingest_queue.qsize(),
+            'high_water_mark': self.high_water_mark,
+            'received': self.received_count,
+            'dropped': self.dropped_count,
+            'filtered': self.filtered_count,
+            'decode_errors': self.decode_error_count,
+        }
 
     def publish(self, topic: str, payload: dict):
         self.client.publish(topic, json.dumps(payload))
\ No newline at end of file
@@ -0,0 +1,98 @@
+import importlib
+import json
+from utils.logging_utils import logger
+
+DECODERS = ("orjson", "ujson", "json")  # Tried in order by get_decoder()
+
+
+def get_decoder(preferred=None):
+    """Return a loads() function, from preferred if given, else the fastest installed module.
+
+    orjson and ujson are optional; the stdlib json module is always available.
+    """
+    for name in ((preferred,) if preferred else ()) + DECODERS:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        logger.debug("Using %s to decode MQTT payloads", name)
+        return module.loads
+    return json.loads
+
+
+def parse_topic(topic):
+    """Split application/{app_id}/device/{dev_eui}/event/{type} into (app_id, dev_eui, type), else None."""
+    parts = topic.split('/')
+    if len(parts) != 6 or parts[0] != "application" or parts[2] != "device" or parts[4] != "event":
+        return None
+    return parts[1], parts[3], parts[5]
+
+
+class DeviceEvent:
+    """The parts of a ChirpStack event payload the handlers use.
+
+    rssi, snr and gateway_id come from the gateway that heard an uplink best.
+    fields holds the few event-specific top-level values (e.g. batteryLevel for
+    status events) and data the decoded application object of an uplink.
+    """
+
+    __slots__ = ('app_id', 'dev_eui', 'event_type', 'device_name', 'rssi', 'snr', 'gateway_id', 'message',
+                 'fields', 'data')
+
+    def __init__(self, app_id, dev_eui, event_type, device_name="Unknown device", rssi=None, snr=None,
+                 gateway_id=None, message=None, fields=None, data=None):
+        self.app_id = app_id
+        self.dev_eui = dev_eui
+        self.event_type = event_type
+        self.device_name = device_name
+        self.rssi = rssi
+        self.snr = snr
+        self.gateway_id = gateway_id
+        self.message = message
+        self.fields = fields or {}
+        self.data = data
+
+    def __repr__(self):
+        return f"DeviceEvent({self.event_type} from {self.dev_eui})"
+
+
+# Top-level payload keys kept in DeviceEvent.fields, per event type
+EVENT_FIELDS = {
+    "status": ("margin", "batteryLevel", "externalPowerSource", "lastSeenAt"),
+    "ack": ("acknowledged",),
+    "log": ("level",),
+    "txack": ("queueItemId",),
+}
+
+
+def decode_event(topic_parts, raw, loads=json.loads):
+    """Build a DeviceEvent from a parsed topic and the raw payload bytes.
+
+    Raises ValueError if the payload is not a JSON object.
+    """
+    app_id, dev_eui, event_type = topic_parts
+    payload = loads(raw)
+    if not isinstance(payload, dict):
+        raise ValueError("payload is not a JSON object")
+    device_info = payload.get('deviceInfo') or {}
+    event = DeviceEvent(app_id, device_info.get('devEui') or dev_eui, event_type,
+                        device_info.get('deviceName', 'Unknown device'))
+
+    if event_type == "up":
+        rx_info = payload.get('rxInfo')
+        if rx_info:
+            best = max(rx_info, key=lambda rx: rx.get('rssi', float('-inf')))
+            event.rssi = best.get('rssi')
+            event.snr = best.get('snr')
+            event.gateway_id = best.get('gatewayId')
+        data = payload.get('object')
+        if isinstance(data, dict):
+            event.data = data
+            event.message = data.get('message')
+    elif event_type == "log":
+        event.message = payload.get('message') or payload.get('description')
+
+    for key in EVENT_FIELDS.get(event_type, ()):
+        if key in payload:
+            event.fields[key] = payload[key]
+    return event
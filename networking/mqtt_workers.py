@@ -0,0 +1,137 @@
+import json
+import multiprocessing
+import queue
+import threading
+import time
+import paho.mqtt.client as mqtt
+import paho.mqtt.publish as mqtt_publish
+from .mqtt_client import MQTTClient, build_topics
+from .mqtt_events import DeviceEvent, decode_event, get_decoder, parse_topic
+from utils.logging_utils import logger
+
+DEFAULT_SHARE_GROUP = "vts-gui"
+WORKER_LOOP_TIMEOUT = 0.05  # seconds each worker waits on its socket before shipping a batch
+RECONNECT_DELAY = 2.0  # seconds
+
+
+def _to_record(event):
+    # DeviceEvent as a plain tuple in __init__ argument order; tuples pickle
+    # about twice as cheaply as the objects themselves
+    return (event.app_id, event.dev_eui, event.event_type, event.device_name, event.rssi, event.snr,
+            event.gateway_id, event.message, event.fields, event.data)
+
+
+def _worker_main(broker, port, topics, event_types, decoder, out_queue, stop_event):
+    # Runs in a worker process: one paho client on a shared subscription, decoding
+    # its share of the traffic and shipping (records, filtered, decode errors)
+    # batches to the parent
+    loads = get_decoder(decoder)
+    event_types = frozenset(event_types) if event_types is not None else None
+    batch = []
+    counts = [0, 0]  # filtered, decode errors since the last batch
+
+    def on_connect(client, userdata, flags, rc):
+        client.subscribe([(topic, 0) for topic in topics])
+
+    def on_message(client, userdata, msg):
+        topic_parts = parse_topic(msg.topic)
+        if topic_parts is None or (event_types is not None and topic_parts[2] not in event_types):
+            counts[0] += 1
+            return
+        try:
+            batch.append(_to_record(decode_event(topic_parts, msg.payload, loads)))
+        except ValueError:
+            counts[1] += 1
+
+    client = mqtt.Client()
+    client.on_connect = on_connect
+    client.on_message = on_message
+    connected = False
+    while not stop_event.is_set():
+        if not connected:
+            try:
+                client.connect(broker, port, 60)
+                connected = True
+            except OSError:
+                time.sleep(RECONNECT_DELAY)
+                continue
+        if client.loop(timeout=WORKER_LOOP_TIMEOUT) != mqtt.MQTT_ERR_SUCCESS:
+            connected = False
+            time.sleep(RECONNECT_DELAY)
+        if batch or any(counts):
+            out_queue.put((batch, counts[0], counts[1]))
+            batch = []
+            counts[:] = [0, 0]
+    client.disconnect()
+
+
+class ShardedMQTTClient(MQTTClient):
+    """MQTTClient whose socket reading, filtering and decoding run in worker processes.
+
+    Each of the workers joins the same MQTT shared subscription ($share/group/...),
+    so the broker load-balances messages between them. Workers drop filtered
+    topics, decode their share and send the results back in batches of plain
+    tuples over a multiprocessing queue, together with their filtered and
+    decode-error counts. A single relay thread unpickles them into DeviceEvent
+    records on the usual ingest queue, so dispatch_pending() and everything
+    downstream stay on the owner's thread exactly as with a single client.
+
+    That relay and the owner's dispatch stay serial: unpickling costs roughly a
+    tenth of decoding a typical uplink, so extra workers help until the relay
+    or dispatch_pending() becomes the bottleneck, not linearly with cores.
+    """
+
+    def __init__(self, broker, port, on_message, workers=2, share_group=DEFAULT_SHARE_GROUP, **kwargs):
+        super().__init__(broker, port, on_message, **kwargs)
+        self.workers = workers
+        self.share_group = share_group
+        # spawn rather than fork: the parent already runs Tk and several threads
+        self.context = multiprocessing.get_context("spawn")
+        self.worker_queue = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.relay = None
+        self._relaying = False
+
+    def _create_client(self):
+        return None  # The workers hold the broker connections
+
+    def connect(self):
+        topics = build_topics(self.app_ids, self.event_types, self.share_group)
+        event_types = sorted(self.event_types) if self.event_types is not None else None
+        for index in range(self.workers):
+            process = self.context.Process(
+                target=_worker_main, name=f"mqtt-worker-{index}", daemon=True,
+                args=(self.broker, self.port, topics, event_types, self.decoder, self.worker_queue, self.stop_event))
+            process.start()
+            self.processes.append(process)
+        self._relaying = True
+        self.relay = threading.Thread(target=self._relay_loop, name="mqtt-relay", daemon=True)
+        self.relay.start()
+        logger.info("Started %d MQTT worker processes on %s", self.workers, ", ".join(topics))
+
+    def _relay_loop(self):
+        while self._relaying:
+            try:
+                batch = self.worker_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            records, filtered, decode_errors = batch
+            self.filtered_count += filtered
+            self.decode_error_count += decode_errors
+            for record in records:
+                self._enqueue(DeviceEvent(*record))
+
+    def disconnect(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self._relaying = False
+        if self.relay:
+            self.relay.join()
+
+    def publish(self, topic, payload):
+        mqtt_publish.single(topic, json.dumps(payload), hostname=self.broker, port=self.port)
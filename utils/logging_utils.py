@@ -1,11 +1,31 @@
+import atexit
 import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
 
+DEBUG = 10
+INFO = 20
+ALERT = 30
+LEVELS = {"debug": DEBUG, "info": INFO, "alert": ALERT}
+
 
 class Logger:
-    def __init__(self, general_log_file="events_log.txt", alert_log_file="alerts_log.txt"):
+    def __init__(self, general_log_file="events_log.txt", alert_log_file="alerts_log.txt",
+                 batch_size=200, flush_interval=1.0, level=INFO, console=True):
         self.general_log_file = general_log_file
         self.alert_log_file = alert_log_file
+        self.level = level
+        self.console = console
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # seconds
+        self.queue = queue.Queue()
+        self.writer = None
+        self._running = False
+        self._write_failed = False  # a file write failed and was reported; later failures stay quiet
+        self._lock = threading.Lock()
         self.ensure_log_directory()
 
     def ensure_log_directory(self):
@@ -14,26 +34,181 @@ class Logger:
             if directory and not os.path.exists(directory):
                 os.makedirs(directory)
 
+    def set_level(self, level):
+        """Set the threshold from a level constant or name ("debug", "info", "alert")."""
+        self.level = LEVELS[level.lower()] if isinstance(level, str) else level
+
+    def is_enabled_for(self, level):
+        return level >= self.level
+
+    def debug(self, message, *args):
+        """Log a diagnostic message; args are %-formatted only if debug output is enabled."""
+        if DEBUG >= self.level:
+            self._emit(message, args, False)
+
+    def info(self, message, *args):
+        if INFO >= self.level:
+            self._emit(message, args, False)
+
+    def alert(self, message, *args):
+        if ALERT >= self.level:
+            self._emit(message, args, True)
+
     def log(self, message, is_alert=False):
-        timestamp = self.get_time()
-        log_entry = f"{timestamp} - {message}"
-        print(log_entry)  # Print to console
+        if is_alert:
+            self.alert(message)
+        else:
+            self.info(message)
 
+    def _emit(self, message, args, is_alert):
+        if args:
+            message = message % args
+        log_entry = f"{self.get_time()} - {message}"
+        if self.console:
+            print(log_entry)  # Print to console
+        self._write(is_alert, log_entry + "\n")
+
+    def _write(self, is_alert, text):
+        with self._lock:
+            if self._running:
+                self.queue.put((is_alert, text))
+                return
+        # No writer thread (before start_logging / after stop_logging, or it failed): write synchronously
+        self._write_sync(is_alert, text)
+
+    def _write_sync(self, is_alert, text):
         log_file = self.alert_log_file if is_alert else self.general_log_file
-        with open(log_file, "a") as f:
-            f.write(log_entry + "\n")
+        try:
+            with open(log_file, "a") as f:
+                f.write(text)
+        except OSError as e:
+            self._report_write_failure(e)
+
+    def _report_write_failure(self, error):
+        if not self._write_failed:
+            self._write_failed = True
+            print(f"Cannot write log file: {error}", file=sys.stderr)
+
+    def _open_files(self):
+        files = {}
+        try:
+            files[False] = open(self.general_log_file, "a")
+            files[True] = open(self.alert_log_file, "a")
+        except OSError:
+            for f in files.values():
+                f.close()
+            raise
+        return files
+
+    def _writer_loop(self):
+        files = {}
+        pending = {False: [], True: []}
+        try:
+            files = self._open_files()
+            self._write_batches(files, pending)
+            self._flush_pending(files, pending)
+        except OSError as e:
+            # Can't open or write the files (e.g. disk full): fall back to synchronous
+            # writes rather than queueing forever with nobody draining
+            self._report_write_failure(e)
+            with self._lock:
+                self._running = False
+            for is_alert, lines in pending.items():
+                for text in lines:
+                    self._write_sync(is_alert, text)
+            self._drain_sync()
+        finally:
+            for f in files.values():
+                try:
+                    f.close()
+                except OSError:
+                    pass  # Already reported; the buffered lines went through _write_sync
+
+    def _write_batches(self, files, pending):
+        # Returns at the stop sentinel; lines still in pending are left to the caller
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                try:
+                    self._flush_pending(files, pending)
+                finally:
+                    item.set()
+                last_flush = time.monotonic()
+                continue
+            if item:
+                is_alert, text = item
+                pending[is_alert].append(text)
+
+            count = len(pending[False]) + len(pending[True])
+            if count >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_pending(files, pending)
+                last_flush = time.monotonic()
+
+    def _drain_sync(self):
+        # Nothing is put on the queue once _running is False, so this empties it for good
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item:
+                self._write_sync(*item)
+
+    def _flush_pending(self, files, pending):
+        for is_alert, lines in pending.items():
+            if lines:
+                files[is_alert].writelines(lines)
+                files[is_alert].flush()
+                lines.clear()
+
+    def flush(self, timeout=5.0):
+        """Block until everything logged so far has reached the log files."""
+        with self._lock:
+            if not self._running:
+                return
+            done = threading.Event()
+            self.queue.put(done)
+        done.wait(timeout)
 
     def get_time(self):
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     def start_logging(self):
+        with self._lock:
+            if not self._running:
+                self.writer = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+                self._running = True
+                self.writer.start()
+                # Drain the queue even if the process exits without stop_logging
+                atexit.register(self._stop_writer)
         self.log("Application started")
 
     def stop_logging(self):
         self.log("Application closed")
-        for log_file in [self.general_log_file, self.alert_log_file]:
-            with open(log_file, "a") as f:
-                f.write("\n" + "=" * 50 + "\n\n")
+        separator = "\n" + "=" * 50 + "\n\n"
+        self._write(False, separator)
+        self._write(True, separator)
+        self._stop_writer()
+
+    def _stop_writer(self):
+        # Anything queued before the sentinel is still written; later messages go straight to disk
+        with self._lock:
+            writer = self.writer if self._running else None
+            self._running = False
+            if writer:
+                self.queue.put(None)
+        if writer:
+            writer.join()
 
 
-logger = Logger()  # Create a global logger instance
\ No newline at end of file
+logger = Logger()  # Create a global logger instance